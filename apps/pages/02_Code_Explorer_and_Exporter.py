@@ -3,10 +3,10 @@ Streamlit page: Code Explorer & Exporter (v2, stateful & resilient)
 
 Fixes & additions:
 - Persist scan results and selection in session_state so removing one file doesn't clear everything.
-- Per-file ✕ buttons to remove single items from the selection.
+- Files grid (st.data_editor) with a Keep checkbox per file to manage the selection.
 - DOCX export no longer crashes on binary/control chars (handled in tools/doc_export.py).
 - New: Open in editor
-  * Folder mode: Open base folder in editor + per-file Open buttons.
+  * Folder mode: Open base folder in editor + Open for the inspected file.
   * ZIP mode: Materialize selection to a temp workspace and open in editor.
 - Refactored to use the centralized `launch_editor` utility.
 """
@@ -14,14 +14,22 @@ from __future__ import annotations
 
 import io
 import os
+import hashlib
+import json
 import re
+import shutil
+import stat
 import sys
 import tempfile
+import threading
 import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import compress
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 
+import pandas as pd
 import streamlit as st
 
 # Make project root importable (this file is /apps/pages/... so root is parents[2])
@@ -30,16 +38,31 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 # Local and shared utils
-from tools.file_harvester import harvest_folder
+from tools.file_harvester import compile_excludes, harvest_folder, default_workers, read_content, should_exclude
 from tools.zip_utils import parse_zipfile
-from tools.doc_export import build_markdown_document, build_docx_document, build_zip_of_sources
+from tools.doc_export import DOCX_AVAILABLE, iter_markdown_document, build_docx_document, build_zip_of_sources
 from tools.trashcan import permanent_delete, move_to_trash
-from tools.ui_utils import launch_editor, button_key  # <-- IMPORTED from shared utility
+from tools.ui_utils import launch_editor  # <-- IMPORTED from shared utility
 
 st.set_page_config(page_title="Code Explorer & Exporter", page_icon="📦", layout="wide")
 st.title("📦 Code Explorer & Exporter")
 
 DEFAULT_BASE = os.path.expanduser("~/Downloads/Projects")
+# Sources zip modes: (compression, compresslevel). Stored is the default; the download is
+# usually gzip'd in transit anyway, and source text gains little past deflate level 1.
+ZIP_MODES = {
+    "stored": (zipfile.ZIP_STORED, None),
+    "deflate-1": (zipfile.ZIP_DEFLATED, 1),
+    "deflate-6": (zipfile.ZIP_DEFLATED, 6),
+}
+# Anything outside letters, digits, dot, underscore and hyphen (runs collapse to one "_")
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+# Characters shown in a preview; the editor has the full file
+PREVIEW_CHARS = 8192
+# Cap for the combined ZIP-mode preview (one code block for the whole selection)
+FULL_PREVIEW_CHARS = 200_000
+# Rows per page in the Files grid
+PAGE_SIZE = 200
 
 with st.expander("Defaults & tips", expanded=False):
     st.markdown(
@@ -64,6 +87,10 @@ with st.sidebar:
     max_kb = st.slider("Max file size (KB)", min_value=50, max_value=4096, value=512, step=50)
     include_hidden = st.checkbox("Include hidden files (e.g., .env)", value=False)
     st.caption("Hidden files are excluded by default.")
+    scan_workers = st.slider(
+        "Scan workers", min_value=1, max_value=64, value=min(16, default_workers()),
+        help="Threads used to read files during a folder scan (1 = sequential).",
+    )
 
     st.subheader("Exclusions")
     default_excludes = [
@@ -76,6 +103,7 @@ with st.sidebar:
         height=100,
     )
     exclude_tokens = [t.strip() for t in excludes_text.split(",") if t.strip()]
+    exclude_re = compile_excludes(exclude_tokens)
 
 
 # ---- Helpers ----
@@ -83,28 +111,353 @@ def _rerun():
     """Helper to rerun the Streamlit app, handling legacy versions."""
     st.rerun()
 
+def _dir_stat(path: Path) -> Optional[os.stat_result]:
+    """One stat call: the stat result if `path` is a directory, else None."""
+    try:
+        st_ = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return st_ if stat.S_ISDIR(st_.st_mode) else None
+
+# ZIP selections are materialized under here for "open in editor"; old ones are pruned
+TEMP_WORKSPACE_ROOT = Path(tempfile.gettempdir()) / "project_builder_zip_open"
+TEMP_WORKSPACE_MAX_AGE_S = 3600
+# On-disk copies of scan results, so a server restart doesn't force a re-walk. Per project
+# checkout (not the shared temp dir), private to this user, and plain JSON: never unpickled.
+SCAN_CACHE_DIR = ROOT / ".streamlit_tmp" / "scan_cache"
+# Records re-stat'ed to validate an on-disk scan before trusting it
+SCAN_CACHE_SPOT_CHECKS = 8
+
+def _scan_cache_file(base_str: str, max_bytes: int, excludes: tuple, hidden: bool) -> Path:
+    key = repr((base_str, max_bytes, excludes, hidden)).encode("utf-8")
+    return SCAN_CACHE_DIR / f"pb_scan_{hashlib.blake2b(key, digest_size=8).hexdigest()}.json"
+
+def _private_dir(path: Path) -> bool:
+    """Create `path` with mode 0o700 if needed; True only if it is a real directory this user owns, closed to others."""
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st_ = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st_.st_mode) or st_.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    return not hasattr(os, "getuid") or st_.st_uid == os.getuid()
+
+def _dirs_signature(base_str: str, hidden: bool, exclude_re) -> bytes:
+    """
+    Fingerprint of every scanned folder's mtime (files are not stat'ed): adding, removing or
+    renaming a file bumps its folder's mtime. Excluded folders are pruned like in the scan.
+    """
+    stamps = []
+    stack = [(base_str, "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            stamps.append((rel_dir, os.stat(dir_path).st_mtime_ns))
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False) and not should_exclude(rel, [], hidden, exclude_re):
+                        stack.append((entry.path, rel))
+        except OSError:
+            continue
+    stamps.sort()
+    return hashlib.blake2b(repr(stamps).encode("utf-8"), digest_size=16).digest()
+
+def _load_persisted_scan(path: Path, dirs_sig: bytes) -> List[Dict] | None:
+    """Return a persisted scan if its folder signature matches and a few sizes still check out."""
+    if not _private_dir(path.parent):
+        return None
+    try:
+        with open(path, "rb") as fh:
+            payload = json.load(fh)
+    except Exception:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("dirs_sig") != dirs_sig.hex():
+        return None
+    results = payload.get("results") or []
+    step = max(1, len(results) // SCAN_CACHE_SPOT_CHECKS)
+    for rec in results[::step][:SCAN_CACHE_SPOT_CHECKS]:
+        try:
+            if os.stat(rec["abs_path"]).st_size != rec.get("size"):
+                return None
+        except OSError:
+            return None
+    return results
+
+def _persist_scan(path: Path, dirs_sig: bytes, results: List[Dict]) -> None:
+    if not _private_dir(path.parent):
+        return  # someone else's (or a shared-writable) directory: don't leave scans in it
+    try:
+        tmp = path.with_suffix(".tmp")
+        payload = {"dirs_sig": dirs_sig.hex(), "results": results}
+        # records are str/int dicts: JSON round-trips them and loading it can't run code
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except Exception:
+        pass  # best effort; the in-process cache still works
+
+@st.cache_data(ttl=300, max_entries=8, show_spinner=False)
+def _cached_harvest(
+    base_str: str, max_bytes: int, excludes: tuple, hidden: bool, dirs_sig: bytes, _workers: int, _exclude_re=None
+) -> List[Dict]:
+    """
+    Memoized metadata-only folder scan, keyed on `_dirs_signature` (every scanned folder's mtime,
+    so a file added/removed/renamed at any depth is a miss); a validated on-disk copy survives
+    server restarts.
+    File contents are read lazily via `read_content` (preview and export).
+    """
+    cache_file = _scan_cache_file(base_str, max_bytes, excludes, hidden)
+    exclude_re = _exclude_re if _exclude_re is not None else compile_excludes(list(excludes))
+    results = _load_persisted_scan(cache_file, dirs_sig)
+    if results is not None:
+        return results
+    results = harvest_folder(
+        base_dir=Path(base_str),
+        max_bytes=max_bytes,
+        exclude_tokens=list(excludes),
+        include_hidden=hidden,
+        max_workers=_workers,
+        with_content=False,
+        exclude_re=exclude_re,
+    )
+    _persist_scan(cache_file, dirs_sig, results)
+    return results
+
+def _selection_sig(files: List[Dict], source: str) -> bytes:
+    """
+    16-byte cache key for a selection: `source` (base folder or upload digest) plus
+    (rel_path, size, mtime_ns) per file. A short digest keeps st.cache_data's own hashing O(1).
+    Lazily-read records are re-stat'ed: a cached scan predates in-place edits, which leave
+    the folder signature untouched.
+    """
+    h = hashlib.blake2b(source.encode("utf-8"), digest_size=16)
+    for f in files:
+        size, mtime_ns = f.get("size", 0), f.get("mtime_ns", 0)
+        if f.get("content") is None and f.get("abs_path"):
+            try:
+                st_ = os.stat(f["abs_path"])
+                size, mtime_ns = st_.st_size, st_.st_mtime_ns
+            except OSError:
+                pass
+        h.update(f"\0{f.get('rel_path', '')}\0{size}\0{mtime_ns}".encode("utf-8"))
+    return h.digest()
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _markdown_bytes(sig: bytes, _files: List[Dict], title: str, base_path: str) -> bytes:
+    """Encoded Markdown export; `_files` is not hashed, `sig` identifies the selection."""
+    # appended chunk by chunk: no full-document str next to its encoded copy
+    buf = io.BytesIO()
+    # identical files (vendored LICENSEs, generated stubs) are written once, later copies point at it
+    chunks = iter_markdown_document(_files, title=title, base_path=base_path, reader=read_content, dedupe=True)
+    for chunk in chunks:
+        buf.write(chunk)
+    return buf.getvalue()
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _docx_bytes(sig: bytes, _files: List[Dict], title: str) -> bytes | None:
+    """DOCX export for a selection (None when python-docx is missing)."""
+    return build_docx_document(_files, title=title, reader=read_content)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _zip_bytes(sig: bytes, _files: List[Dict], mode: str = "stored") -> bytes:
+    """Sources zip for a selection, built in a spooled temp file (spills to disk past 64 MB)."""
+    compression, level = ZIP_MODES[mode]
+    with tempfile.SpooledTemporaryFile(max_size=64 << 20) as spool:
+        build_zip_of_sources(_files, fp=spool, compresslevel=level, compression=compression)
+        spool.seek(0)
+        return spool.read()
+
+def _upload_digest(upl) -> str:
+    """Content hash of an upload, computed once per upload (zero-copy over its buffer)."""
+    upload_id = getattr(upl, "file_id", None) or (upl.name, upl.size)
+    cached = st.session_state.get("cex_zip_hash")
+    if cached and cached[0] == upload_id:
+        return cached[1]
+    digest = hashlib.blake2b(upl.getbuffer(), digest_size=16).hexdigest()
+    st.session_state["cex_zip_hash"] = (upload_id, digest)
+    return digest
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _parse_zip_cached(
+    digest: str, _upl, max_bytes: int, excludes: tuple, hidden: bool, _exclude_re=None
+) -> List[Dict]:
+    """
+    Parse an uploaded zip once per content digest and filter set; reruns reuse the records.
+    Records hold every file's text, so only the last few uploads are kept.
+    """
+    _upl.seek(0)
+    with zipfile.ZipFile(_upl) as zf:
+        return parse_zipfile(
+            zf, max_bytes=max_bytes, exclude_tokens=list(excludes),
+            include_hidden=hidden, exclude_re=_exclude_re,
+        )
+
+def _prepare_then_download(
+    slot: str, sig: bytes, build: Callable[[], bytes], label: str, file_name: str, mime: Optional[str] = None
+) -> None:
+    """
+    Show a "Prepare" button; only after it is clicked for the current selection does
+    `build` run (and on later reruns it is a cache hit) and a download button appear.
+    """
+    prepared = st.session_state.setdefault("cex_prepared", {})  # slot -> selection sig
+    if prepared.get(slot) != sig:
+        if not st.button(f"Prepare {label}", key=f"prep_{slot}", use_container_width=True):
+            return
+        prepared[slot] = sig
+    st.download_button(f"⬇️ Download {label}", build(), file_name, mime, key=f"dl_{slot}", use_container_width=True)
+
+@st.cache_data(ttl=30, max_entries=16, show_spinner=False)
+def _list_children(base_str: str, mtime_ns: int) -> List[str]:
+    """Sorted non-hidden children of a folder; `mtime_ns` keys the cache to its contents."""
+    with os.scandir(base_str) as it:
+        return sorted(e.name for e in it if not e.name.startswith("."))
+
+def _prune_stale_workspaces() -> None:
+    """Remove temp workspaces older than TEMP_WORKSPACE_MAX_AGE_S (names are epoch seconds)."""
+    cutoff = time.time() - TEMP_WORKSPACE_MAX_AGE_S
+    try:
+        with os.scandir(TEMP_WORKSPACE_ROOT) as it:
+            stale = [e.path for e in it if e.name.isdigit() and int(e.name) < cutoff]
+    except OSError:
+        return
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+
 def _materialize_selection_to_temp(files: List[Dict]) -> Path:
     """
     Writes selected in-memory files (from a ZIP) to a temporary directory
     so they can be opened in an external editor.
     Returns the path to the temporary directory.
     """
-    base = Path(tempfile.gettempdir()) / "project_builder_zip_open" / str(int(time.time()))
+    # Cleanup runs in the background so it never delays the editor launch
+    threading.Thread(target=_prune_stale_workspaces, daemon=True).start()
+    base = TEMP_WORKSPACE_ROOT / str(int(time.time()))
+    pairs = []
+    parents = set()
     for f in files:
         rel = (f.get("rel_path") or f.get("path") or "file.txt").lstrip("/\\")
         dest = base / rel
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        content = f.get("content", "")
-        # Write as UTF-8, replacing any invalid characters
-        dest.write_text(content, encoding="utf-8", errors="replace")
+        parents.add(dest.parent)
+        # Encode once as UTF-8, replacing any invalid characters
+        pairs.append((dest, f.get("content", "").encode("utf-8", errors="replace")))
+    for d in parents:
+        os.makedirs(d, exist_ok=True)
+    # File writes release the GIL, so a small pool overlaps the open/write/close syscalls
+    # list() drains the map so a failed write raises here
+    with ThreadPoolExecutor(max_workers=min(default_workers(), max(1, len(pairs)))) as ex:
+        list(ex.map(lambda p: p[0].write_bytes(p[1]), pairs))
     return base
 
+def _preview_text(content: str) -> str:
+    """Bound what st.code has to highlight and ship to the browser."""
+    if len(content) <= PREVIEW_CHARS:
+        return content
+    return content[:PREVIEW_CHARS] + "\n\n… (truncated, open in editor for full file)"
+
 def _safe_project_name(name: str) -> str:
     """Sanitizes a project name for use in filenames."""
-    s = (name or "project").strip().strip("/\\")
-    # Allow letters, numbers, dot, underscore, hyphen; replace others
-    return re.sub(r"[^A-Za-z0-9._-]+", "_", s)
+    return _UNSAFE_NAME_RE.sub("_", (name or "project").strip().strip("/\\"))
+
 
+@st.fragment
+def _export_section(slot: str, files: List[Dict], sig: bytes, title: str, base_label: str, project_name: str) -> None:
+    """
+    Prepare → Download buttons for the three export formats. A fragment, so a Prepare
+    click reruns only this block, not the scan/grid code above it.
+    """
+    st.subheader("📄 Export Selection")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        _prepare_then_download(
+            f"{slot}_md", sig, lambda: _markdown_bytes(sig, files, title, base_label),
+            "Markdown", f"{project_name}_export.md", "text/markdown",
+        )
+    with col2:
+        if DOCX_AVAILABLE:
+            _prepare_then_download(
+                f"{slot}_docx", sig, lambda: _docx_bytes(sig, files, title),
+                ".docx", f"{project_name}_export.docx",
+            )
+        else:
+            st.info("Install `python-docx` to enable .docx export.")
+    with col3:
+        zip_mode = st.selectbox("Zip compression", list(ZIP_MODES), key=f"{slot}_zip_mode")
+        _prepare_then_download(
+            f"{slot}_zip", sig + zip_mode.encode("utf-8"), lambda: _zip_bytes(sig, files, zip_mode),
+            ".zip", f"{project_name}_sources.zip", "application/zip",
+        )
+
+def _scan_frame(results: List[Dict]) -> pd.DataFrame:
+    """Column-wise copy of the scan metadata, built once per scan for the grid and selection masks."""
+    return pd.DataFrame({
+        "path": [r["rel_path"] for r in results],
+        "size": [r.get("size", 0) for r in results],
+        "lang": [r.get("language", "text") for r in results],
+    })
+
+@st.fragment
+def _files_grid(base: Path) -> None:
+    """
+    Paginated Keep grid plus a single inspect/preview row. Runs as a fragment, so paging,
+    picking and previewing only rerun this block; a selection change reruns the page.
+    """
+    st.markdown("#### Files")
+    st.caption("Untick **Keep** to drop a file from the export.")
+    results = st.session_state.cex_scan_results
+    scan_df = st.session_state.cex_scan_df
+    selected = st.session_state.cex_selected_keys
+    n_pages = max(1, (len(results) + PAGE_SIZE - 1) // PAGE_SIZE)
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key="cex_page") - 1
+    lo, hi = page * PAGE_SIZE, (page + 1) * PAGE_SIZE
+    page_rows = results[lo:hi]
+
+    # One grid component per page instead of five widgets per row; the page is a slice
+    # of the per-scan frame, only the Keep column is computed here
+    page_df = scan_df.iloc[lo:hi]
+    grid = page_df.assign(keep=page_df["path"].isin(selected))[["keep", "path", "size", "lang"]].reset_index(drop=True)
+    # Stable key per page so ticking a box doesn't remount the grid; the generation
+    # counter discards pending edits once Scan/Reset rebuilds the selection.
+    edited = st.data_editor(
+        grid,
+        column_config={
+            "keep": st.column_config.CheckboxColumn("Keep"),
+            "path": st.column_config.TextColumn("Path"),
+            "size": st.column_config.NumberColumn("Bytes"),
+            "lang": st.column_config.TextColumn("Language"),
+        },
+        disabled=["path", "size", "lang"],
+        num_rows="fixed",
+        hide_index=True,
+        use_container_width=True,
+        key=f"cex_grid_{st.session_state.cex_grid_gen}_{page}",
+    )
+    changed = False
+    for rel, keep in zip(page_df["path"], edited["keep"]):
+        if keep and rel not in selected:
+            selected.add(rel)
+            changed = True
+        elif not keep and rel in selected:
+            selected.discard(rel)
+            changed = True
+    if changed:
+        _rerun()  # a fragment edit only reruns the fragment; the count and exports live outside
+
+    if page_rows:
+        by_rel = {r["rel_path"]: r for r in page_rows}
+        pick = st.selectbox("Inspect file", list(by_rel), key="cex_pick")
+        p1, p2 = st.columns(2)
+        # Content is only read and sent to the browser while the preview is on
+        show_preview = p1.toggle("Preview", key="cex_show_preview")
+        if p2.button("Open in editor", key="cex_open_pick", use_container_width=True):
+            st.toast(launch_editor(base / pick))
+        if show_preview and pick in by_rel:
+            st.code(_preview_text(read_content(by_rel[pick])), language=by_rel[pick].get("language"))
+    if not selected:
+        st.info("No files selected. Click **Reset Selection** to re-select all scanned files.")
 
 # ----------------------------
 # Tab 1: From folder path
@@ -115,7 +468,10 @@ with tab1:
     # Initialize session_state for this tab
     st.session_state.setdefault("cex_last_base", "")
     st.session_state.setdefault("cex_scan_results", [])
-    st.session_state.setdefault("cex_selected", [])
+    if "cex_scan_df" not in st.session_state:
+        st.session_state.cex_scan_df = _scan_frame([])  # path/size/lang columns of the scan
+    st.session_state.setdefault("cex_selected_keys", set())  # rel_paths kept for export
+    st.session_state.setdefault("cex_grid_gen", 0)  # bumped to drop stale grid edits
 
     base_path = st.text_input("Base folder path", value=st.session_state.get("cex_last_base") or DEFAULT_BASE)
 
@@ -123,76 +479,53 @@ with tab1:
     scan_clicked = col_a.button("Scan Folder", type="primary", use_container_width=True)
     reset_sel_clicked = col_b.button("Reset Selection", use_container_width=True)
 
-    # If base path changes, clear the previous results to avoid confusion
-    if base_path != st.session_state["cex_last_base"]:
-        st.session_state.update(cex_last_base=base_path, cex_scan_results=[], cex_selected=[])
-
     base = Path(base_path).expanduser().resolve()
 
     if scan_clicked:
-        if not base.is_dir():
+        base_stat = _dir_stat(base)
+        if base_stat is None:
             st.error(f"Path not found or not a directory: `{base}`")
         else:
-            with st.spinner("Walking folder and reading files..."):
-                results = harvest_folder(
-                    base_dir=base,
-                    max_bytes=max_kb * 1024,
-                    exclude_tokens=exclude_tokens,
-                    include_hidden=include_hidden,
+            with st.spinner("Walking folder..."):
+                results = _cached_harvest(
+                    str(base), max_kb * 1024, tuple(exclude_tokens), include_hidden,
+                    _dirs_signature(str(base), include_hidden, exclude_re), scan_workers, exclude_re,
                 )
+            # Results are only replaced by an explicit scan of a valid folder, not by typing
+            st.session_state.cex_last_base = str(base)
             st.session_state.cex_scan_results = results
-            st.session_state.cex_selected = list(results)  # Start with all files selected
+            st.session_state.cex_scan_df = _scan_frame(results)
+            st.session_state.cex_selected_keys = {r["rel_path"] for r in results}  # Start with all files selected
+            st.session_state.cex_grid_gen += 1
             _rerun()
 
     if reset_sel_clicked and st.session_state.cex_scan_results:
-        st.session_state.cex_selected = list(st.session_state.cex_scan_results)
+        st.session_state.cex_selected_keys = {r["rel_path"] for r in st.session_state.cex_scan_results}
+        st.session_state.cex_grid_gen += 1
         _rerun()
 
-    selected = st.session_state.cex_selected
-    if st.session_state.cex_scan_results:
-        st.success(f"Scanned {len(st.session_state.cex_scan_results)} file(s). Currently selected: **{len(selected)}**")
+    results = st.session_state.cex_scan_results
+    selected = st.session_state.cex_selected_keys
+    if results:
+        # Actions below refer to the folder that was scanned, not whatever is typed right now
+        typed_base, base = base, Path(st.session_state.cex_last_base)
+        if typed_base != base:
+            st.caption(f"Showing results for `{base}` — click **Scan Folder** to switch.")
+        st.success(f"Scanned {len(results)} file(s). Currently selected: **{len(selected)}**")
 
         if st.button("🖥️ Open base folder in editor", key="open_base_editor"):
             st.toast(launch_editor(base))
 
-        st.markdown("#### Selected Files")
-        if not selected:
-            st.info("No files selected. Click **Reset Selection** to re-select all scanned files.")
-        else:
-            to_remove_indices = []
-            for i, f in enumerate(selected):
-                rel = f.get("rel_path", "unknown_file")
-                c1, c2, c3, c4, c5 = st.columns([0.1, 0.4, 0.2, 0.15, 0.15])
-                if c1.button("✕", key=button_key("rm", rel), help="Remove from selection"):
-                    to_remove_indices.append(i)
-                c2.write(rel)
-                c3.caption(f"{f.get('size', 0)} bytes | `{f.get('language', 'text')}`")
-                with c4.popover("Preview"):
-                    st.code(f.get("content", ""), language=f.get("language"))
-                if c5.button("Open", key=button_key("open", rel)):
-                    st.toast(launch_editor(base / rel))
-
-            if to_remove_indices:
-                st.session_state.cex_selected = [f for i, f in enumerate(selected) if i not in to_remove_indices]
-                _rerun()
+        _files_grid(base)
 
         st.divider()
-        st.subheader("📄 Export Selection")
-        col1, col2, col3 = st.columns(3)
-        project_name = _safe_project_name(base.name)
-
-        with col1:
-            md_doc = build_markdown_document(selected, title="Code Export — Folder Mode", base_path=str(base))
-            st.download_button("⬇️ Download Markdown", md_doc, f"{project_name}_export.md", "text/markdown", use_container_width=True)
-        with col2:
-            docx_bytes = build_docx_document(selected, title="Code Export — Folder Mode")
-            if docx_bytes:
-                st.download_button("⬇️ Download .docx", docx_bytes, f"{project_name}_export.docx", use_container_width=True)
-            else:
-                st.info("Install `python-docx` to enable .docx export.")
-        with col3:
-            zip_bytes = build_zip_of_sources(selected)
-            st.download_button("⬇️ Download .zip", zip_bytes, f"{project_name}_sources.zip", "application/zip", use_container_width=True)
+        # export in scan order, independent of the order files were (re)selected
+        keep_mask = st.session_state.cex_scan_df["path"].isin(selected).to_numpy()
+        selected_files = list(compress(results, keep_mask))
+        _export_section(
+            "folder", selected_files, _selection_sig(selected_files, str(base)),
+            "Code Export — Folder Mode", str(base), _safe_project_name(base.name),
+        )
 
 # ----------------------------
 # Tab 2: From uploaded zip
@@ -203,43 +536,37 @@ with tab2:
     if upl:
         try:
             with st.spinner("Reading zip contents..."):
-                zf = zipfile.ZipFile(io.BytesIO(upl.read()))
-                results_zip = parse_zipfile(zf, max_bytes=max_kb * 1024, exclude_tokens=exclude_tokens, include_hidden=include_hidden)
+                # UploadedFile is already seekable; no need for a second in-memory copy
+                results_zip = _parse_zip_cached(
+                    _upload_digest(upl), upl, max_kb * 1024, tuple(exclude_tokens), include_hidden, exclude_re
+                )
 
             st.success(f"Found {len(results_zip)} textual file(s) in zip.")
             
             all_paths = [r["rel_path"] for r in results_zip]
             selected_paths = st.multiselect("Select files to include in export", options=all_paths, default=all_paths)
-            filtered_zip = [r for r in results_zip if r["rel_path"] in selected_paths]
+            keep = set(selected_paths)  # O(1) membership instead of scanning the list per file
+            filtered_zip = [r for r in results_zip if r["rel_path"] in keep]
 
             if st.button("🖥️ Open selection in editor (temp folder)", key="open_zip_selection"):
                 temp_dir = _materialize_selection_to_temp(filtered_zip)
                 st.toast(launch_editor(temp_dir))
                 st.caption(f"Temp workspace created at: `{temp_dir}`")
 
-            with st.expander("🔎 Preview Selected Files", expanded=False):
-                for r in filtered_zip:
-                    with st.container(border=True):
-                        st.markdown(f"**{r['rel_path']}** ({r['size']} bytes)")
-                        st.code(r["content"], language=r.get("language") or "text")
-            
+            zip_sig = _selection_sig(filtered_zip, _upload_digest(upl))
+            # An expander body runs even when collapsed; the toggle keeps it from running at all
+            if st.toggle("🔎 Enable full preview", value=False, key="cex_fp_toggle"):
+                # Same cached Markdown the export uses, rendered as a single code block
+                combined_md = _markdown_bytes(zip_sig, filtered_zip, "Code Export — ZIP Mode", upl.name).decode("utf-8")
+                if len(combined_md) > FULL_PREVIEW_CHARS:
+                    st.caption(f"Showing the first {FULL_PREVIEW_CHARS:,} of {len(combined_md):,} characters.")
+                st.code(combined_md[:FULL_PREVIEW_CHARS], language="markdown")
+
             st.divider()
-            st.subheader("📄 Export Selection")
-            col1, col2, col3 = st.columns(3)
-            zip_project_name = _safe_project_name(Path(upl.name).stem)
-
-            with col1:
-                md_zip = build_markdown_document(filtered_zip, title="Code Export — ZIP Mode", base_path=upl.name)
-                st.download_button("⬇️ Download Markdown", md_zip, f"{zip_project_name}_export.md", "text/markdown", use_container_width=True)
-            with col2:
-                docx_zip = build_docx_document(filtered_zip, title="Code Export — ZIP Mode")
-                if docx_zip:
-                    st.download_button("⬇️ Download .docx", docx_zip, f"{zip_project_name}_export.docx", use_container_width=True)
-                else:
-                    st.info("Install `python-docx` to enable.")
-            with col3:
-                zip_sources = build_zip_of_sources(filtered_zip)
-                st.download_button("⬇️ Download .zip", zip_sources, f"{zip_project_name}_sources.zip", "application/zip", use_container_width=True)
+            _export_section(
+                "zip", filtered_zip, zip_sig,
+                "Code Export — ZIP Mode", upl.name, _safe_project_name(Path(upl.name).stem),
+            )
 
         except Exception as e:
             st.error("Failed to process ZIP file.")
@@ -252,52 +579,56 @@ with tab3:
     st.subheader("🗑️ Danger Zone File Manager")
     st.warning("⚠️ Actions here are permanent or move files. Proceed with caution.")
     
-    danger_base_path = st.text_input("Base folder for file operations", value=DEFAULT_BASE, key="danger_base")
-    danger_base = Path(danger_base_path).expanduser().resolve()
-
-    if not danger_base.is_dir():
-        st.error(f"Path not found or not a directory: `{danger_base}`")
-    else:
-        try:
-            children = [p.name for p in danger_base.iterdir() if not p.name.startswith('.')]
-            selected_items = st.multiselect(
-                "Select files or folders to manage",
-                options=sorted(children),
-                key="danger_zone_selection"
-            )
+    # Off by default: nothing below (listing, widgets) runs until it is switched on
+    if st.toggle("Enable danger zone", value=False, key="danger_enabled"):
+        danger_base_path = st.text_input("Base folder for file operations", value=DEFAULT_BASE, key="danger_base")
+        danger_base = Path(danger_base_path).expanduser().resolve()
+
+        danger_stat = _dir_stat(danger_base)
+        if danger_stat is None:
+            st.error(f"Path not found or not a directory: `{danger_base}`")
+        else:
+            try:
+                # the folder's mtime changes on add/remove/rename, so trash/delete invalidate this
+                children = _list_children(str(danger_base), danger_stat.st_mtime_ns)
+                selected_items = st.multiselect(
+                    "Select files or folders to manage",
+                    options=children,
+                    key="danger_zone_selection"
+                )
 
-            if selected_items:
-                col_safe, col_perm = st.columns(2)
+                if selected_items:
+                    col_safe, col_perm = st.columns(2)
                 
-                if col_safe.button("Move to `.trash/` (Safe)", use_container_width=True):
-                    with st.spinner("Moving items to trash..."):
-                        results = move_to_trash(danger_base, selected_items)
-                        st.success(f"Moved {len(results)} items to a new folder inside `{danger_base / '.trash'}`")
-                        st.rerun()
-
-                if col_perm.button("🔥 Delete Permanently", type="primary", use_container_width=True):
-                    st.session_state.show_perm_delete_confirm = True
-
-                if st.session_state.get("show_perm_delete_confirm"):
-                    with st.form("confirm_delete"):
-                        st.error("This action is irreversible. Are you absolutely sure?")
-                        confirm_text = st.text_input("Type `delete permanently` to confirm:")
-                        submitted = st.form_submit_button("Confirm Permanent Deletion")
-
-                        if submitted:
-                            if confirm_text == "delete permanently":
-                                with st.spinner("Permanently deleting items..."):
-                                    results = permanent_delete(danger_base, selected_items)
-                                    st.success(f"Permanently deleted {len(results)} items.")
+                    if col_safe.button("Move to `.trash/` (Safe)", use_container_width=True):
+                        with st.spinner("Moving items to trash..."):
+                            results = move_to_trash(danger_base, selected_items)
+                            st.success(f"Moved {len(results)} items to a new folder inside `{danger_base / '.trash'}`")
+                            st.rerun()
+
+                    if col_perm.button("🔥 Delete Permanently", type="primary", use_container_width=True):
+                        st.session_state.show_perm_delete_confirm = True
+
+                    if st.session_state.get("show_perm_delete_confirm"):
+                        with st.form("confirm_delete"):
+                            st.error("This action is irreversible. Are you absolutely sure?")
+                            confirm_text = st.text_input("Type `delete permanently` to confirm:")
+                            submitted = st.form_submit_button("Confirm Permanent Deletion")
+
+                            if submitted:
+                                if confirm_text == "delete permanently":
+                                    with st.spinner("Permanently deleting items..."):
+                                        results = permanent_delete(danger_base, selected_items)
+                                        st.success(f"Permanently deleted {len(results)} items.")
+                                        st.session_state.show_perm_delete_confirm = False
+                                        st.rerun()
+                                else:
+                                    st.warning("Confirmation text did not match. Deletion cancelled.")
                                     st.session_state.show_perm_delete_confirm = False
                                     st.rerun()
-                            else:
-                                st.warning("Confirmation text did not match. Deletion cancelled.")
-                                st.session_state.show_perm_delete_confirm = False
-                                st.rerun()
 
-        except Exception as e:
-            st.error(f"An error occurred while listing directory contents: {e}")
+            except Exception as e:
+                st.error(f"An error occurred while listing directory contents: {e}")
 
 # """
 # Streamlit page: Code Explorer & Exporter (v2, stateful & resilient)
@@ -10,20 +10,134 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 # --------------------------------------------------------------------
 
+import codecs
+import hashlib
+import html
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+import httpx
 import streamlit as st
 
-# Load .env early so key badges reflect env even before running
-try:
-    from dotenv import load_dotenv, find_dotenv  # type: ignore
-    load_dotenv(find_dotenv(usecwd=True) or (ROOT / ".env"), override=False)
-except Exception:
-    pass
+# Load .env early so key badges reflect env even before running. Once per process: the
+# script re-executes on every rerun (module globals don't survive), and find_dotenv stats
+# every directory up to the filesystem root.
+@st.cache_resource(show_spinner=False)
+def _load_dotenv_once() -> bool:
+    try:
+        from dotenv import load_dotenv, find_dotenv  # type: ignore
+        return load_dotenv(find_dotenv(usecwd=True) or (ROOT / ".env"), override=False)
+    except Exception:
+        return False
+
+_load_dotenv_once()
 
 # Import shared utilities
-from tools.codefill import codefill_run, resolve_root_dir, _find_all_files
+from tools.codefill import codefill_parse, codefill_run, codefill_write, resolve_root_dir, _list_rel_files
 from tools.ui_utils import launch_editor, button_key
 from tools.file_harvester import guess_language
+from tools.llm_client import clear_cache
+
+
+# Sidebar knobs forwarded to tools/llm_client.py through the environment, with their fallbacks
+LLM_KNOB_FALLBACKS = {
+    "LLM_THROTTLE_MS": "1200",
+    "LLM_MAX_RETRIES": "5",
+    "LLM_BACKOFF_BASE_MS": "800",
+    "LLM_BACKOFF_MAX_MS": "8000",
+    "LLM_MAX_CHARS": "90000",
+    "LLM_CONCURRENCY": "4",
+}
+LLM_KNOBS = list(LLM_KNOB_FALLBACKS)
+# Run log lines kept; retry spam beyond this drops the oldest lines
+LOG_MAX_LINES = 2000
+# Generated files larger than this are shown truncated without syntax highlighting
+CODE_HIGHLIGHT_MAX_CHARS = 200_000
+# Characters of each generated file inlined in the collapsible listing
+DETAILS_MAX_CHARS = 20_000
+# On-disk LLM response cache (tools/llm_client.py); an explicit LLM_CACHE_DIR wins
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR") or str(ROOT / ".streamlit_tmp" / "llm_cache")
+# Generated files listed per "Load more" step
+GENERATED_PAGE_SIZE = 50
+# Bytes of a generated file read for display; the whole file is only read for download
+VIEW_MAX_BYTES = 256 * 1024
+
+
+def _load_one(p: Path, max_bytes: Optional[int] = VIEW_MAX_BYTES) -> tuple:
+    """
+    (content, language, size) for a generated file, or (exception, None, 0) when it can't be read.
+    Only the first `max_bytes` are read (None = whole file); `size` tells whether that was all of it.
+    """
+    try:
+        with open(p, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            data = fh.read() if max_bytes is None else fh.read(max_bytes)
+        # incremental decode: a character cut at the cap is dropped, not shown as U+FFFD
+        text = codecs.getincrementaldecoder("utf-8")("replace").decode(data, len(data) >= size)
+        return text, guess_language(p) or "text", size
+    except Exception as e:
+        return e, None, 0
+
+
+def _load_generated(dest_root: Path, rels: list) -> Dict[str, tuple]:
+    # small blocking reads: overlap them on a thread pool
+    if len(rels) < 2:
+        return {rel: _load_one(dest_root / rel) for rel in rels}
+    with ThreadPoolExecutor(max_workers=min(16, len(rels))) as ex:
+        return dict(zip(rels, ex.map(_load_one, (dest_root / rel for rel in rels))))
+
+
+def _details_html(rels: list, loaded: Dict[str, tuple]) -> str:
+    """One collapsible <details> per file. Newlines are entities so blank lines can't end the HTML block."""
+    parts = []
+    for rel in rels:
+        content, _lang, size = loaded[rel]
+        if isinstance(content, Exception):
+            body = f"<em>Could not read file: {html.escape(str(content))}</em>"
+        else:
+            if len(content) > DETAILS_MAX_CHARS or size > VIEW_MAX_BYTES:
+                content = content[:DETAILS_MAX_CHARS] + "\n…[truncated, use Full view]"
+            body = f"<pre><code>{html.escape(content).replace(chr(10), '&#10;')}</code></pre>"
+        parts.append(f"<details><summary><code>{html.escape(rel)}</code></summary>{body}</details>")
+    return "\n".join(parts)
+
+
+@st.cache_resource(show_spinner=False)
+def _ensure_dirs(*dirs: str) -> None:
+    # the log and temp-dump folders: created once per process instead of on every run;
+    # the writers recreate them if they are deleted later
+    for d in dirs:
+        Path(d).mkdir(parents=True, exist_ok=True)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _preview_root(base: str, root: str) -> str:
+    # resolve_root_dir resolves and mkdirs; typing in other widgets shouldn't repeat that.
+    # The ttl re-creates the folder within a minute if it is deleted while the page is open.
+    return str(resolve_root_dir(base, root))
+
+
+@st.cache_resource(show_spinner=False)
+def _http_client(provider: str) -> httpx.Client:
+    """Pooled keep-alive connections to the provider, shared by every run in this server."""
+    return httpx.Client(limits=httpx.Limits(max_keepalive_connections=20, max_connections=40), timeout=60)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_cached(
+    dump_digest: str, root_hint: str, provider: str, knobs: tuple,
+    _dump_path: Path, _logger: Callable[[str], None], _checkpoint: Optional[Path] = None,
+) -> Dict[str, object]:
+    """
+    The parsed bundle memoized on the dump's sha256 plus every setting that shapes the LLM calls;
+    `_dump_path`/`_logger`/`_checkpoint` are not hashed. A hit skips parsing and all LLM calls.
+    Only data is cached: the files are always written by codefill_write, so a deleted or
+    edited destination is repaired on the next run.
+    """
+    return codefill_parse(
+        _dump_path, root_hint, logger=_logger, http_client=_http_client(provider), checkpoint=_checkpoint,
+    )
 
 
 st.set_page_config(page_title="Project Structure Builder", layout="wide")
@@ -46,12 +160,28 @@ with st.sidebar:
     provider = st.selectbox("LLM provider", options=["groq", "openai"], index=0)
 
     st.subheader("LLM Reliability")
-    # These names match tools/llm_client.py
-    st.number_input("LLM throttle per request (ms)", key="LLM_THROTTLE_MS", min_value=0, value=int(os.getenv("LLM_THROTTLE_MS", "1200")))
-    st.number_input("LLM max retries (on 429/5xx)", key="LLM_MAX_RETRIES", min_value=0, value=int(os.getenv("LLM_MAX_RETRIES", "5")))
-    st.number_input("LLM backoff base (ms)", key="LLM_BACKOFF_BASE_MS", min_value=0, value=int(os.getenv("LLM_BACKOFF_BASE_MS", "800")))
-    st.number_input("LLM backoff max (ms)", key="LLM_BACKOFF_MAX_MS", min_value=0, value=int(os.getenv("LLM_BACKOFF_MAX_MS", "8000")))
-    st.number_input("LLM prompt max chars (cap)", key="LLM_MAX_CHARS", min_value=8000, value=int(os.getenv("LLM_MAX_CHARS", "90000")))
+    # These names match tools/llm_client.py; one pass over the environment for all defaults
+    knob_defaults = {k: int(os.getenv(k, d)) for k, d in LLM_KNOB_FALLBACKS.items()}
+    st.number_input("LLM throttle per request (ms)", key="LLM_THROTTLE_MS", min_value=0, value=knob_defaults["LLM_THROTTLE_MS"])
+    st.number_input("LLM max retries (on 429/5xx)", key="LLM_MAX_RETRIES", min_value=0, value=knob_defaults["LLM_MAX_RETRIES"])
+    st.number_input("LLM backoff base (ms)", key="LLM_BACKOFF_BASE_MS", min_value=0, value=knob_defaults["LLM_BACKOFF_BASE_MS"])
+    st.number_input("LLM backoff max (ms)", key="LLM_BACKOFF_MAX_MS", min_value=0, value=knob_defaults["LLM_BACKOFF_MAX_MS"])
+    st.number_input("LLM prompt max chars (cap)", key="LLM_MAX_CHARS", min_value=8000, value=knob_defaults["LLM_MAX_CHARS"])
+    st.number_input("Concurrent LLM requests", key="LLM_CONCURRENCY", min_value=1, max_value=16, value=knob_defaults["LLM_CONCURRENCY"])
+    reuse_runs = st.checkbox(
+        "Reuse the parsed dump when unchanged", value=True,
+        help="Skips parsing and LLM calls when the dump and settings match an earlier run in this server; files are still written.",
+    )
+    resume_runs = st.checkbox(
+        "Resume an interrupted run", value=True,
+        help="Reuses LLM answers a failed or interrupted run of the same dump already received.",
+    )
+    use_llm_cache = st.checkbox(
+        "Cache LLM responses on disk", value=True,
+        help=f"Answers identical prompts from {LLM_CACHE_DIR}; bounded by LLM_CACHE_MAX_MB (default 256).",
+    )
+    if st.button("Clear LLM cache", key=button_key("clear_llm_cache")):
+        st.toast(f"Removed {clear_cache(LLM_CACHE_DIR)} cached LLM responses.")
 
     # Key badges
     openai_ok = bool(os.getenv("OPENAI_API_KEY"))
@@ -69,7 +199,7 @@ dump_text = st.text_area(
     placeholder="Paste dump here…",
 )
 
-dest_preview = resolve_root_dir(base_dir, root_name)
+dest_preview = Path(_preview_root(base_dir, root_name))
 st.caption(f"Project will be generated in: `{dest_preview}`")
 
 # Open destination in VS Code (works even without `code` CLI)
@@ -83,38 +213,51 @@ st.divider()
 
 # Session log buffer
 if "log_messages" not in st.session_state:
-    st.session_state.log_messages = []
+    st.session_state.log_messages = deque(maxlen=LOG_MAX_LINES)
 
 log_container = st.container()
 
 if run:
-    # Wire env for the runner + LLM client
-    os.environ["CODEFILL_FORCE_BASE_DIR"] = base_dir
-    os.environ["CODEFILL_FORCE_ROOT_NAME"] = root_name
-    os.environ["CODEFILL_MODE"] = mode
-    os.environ["LLM_PROVIDER"] = provider
-
-    # Pass sidebar reliability settings into env
-    for key in ["LLM_THROTTLE_MS", "LLM_MAX_RETRIES", "LLM_BACKOFF_BASE_MS", "LLM_BACKOFF_MAX_MS", "LLM_MAX_CHARS"]:
-        os.environ[key] = str(st.session_state.get(key, os.getenv(key, "")))
+    # Wire env for the runner + LLM client, sidebar reliability settings included, in one update
+    os.environ.update({
+        "CODEFILL_FORCE_BASE_DIR": base_dir,
+        "CODEFILL_FORCE_ROOT_NAME": root_name,
+        "CODEFILL_MODE": mode,
+        "LLM_PROVIDER": provider,
+        **{key: str(st.session_state.get(key, os.getenv(key, ""))) for key in LLM_KNOBS},
+    })
 
     # Optional: centralize logs from client/normalizer
     os.environ.setdefault("LLM_LOG_FILE", str(ROOT / "logs" / "llm_calls.log"))
-    Path(os.environ["LLM_LOG_FILE"]).parent.mkdir(parents=True, exist_ok=True)
-
-    tmp_dir = ROOT / ".streamlit_tmp"
-    tmp_dir.mkdir(exist_ok=True)
-    dump_path = tmp_dir / "dump.txt"
-    dump_path.write_text(dump_text or "", encoding="utf-8")
+    # Identical prompts (same dump, model and settings) are answered from disk unless switched off
+    os.environ["LLM_CACHE_DIR"] = LLM_CACHE_DIR
+    os.environ["LLM_CACHE"] = "1" if use_llm_cache else "0"
+    _ensure_dirs(str(Path(os.environ["LLM_LOG_FILE"]).parent), str(ROOT / ".streamlit_tmp"))
 
-    if not dump_path.read_text(encoding="utf-8").strip():
+    # Validate the in-memory text; the dump file is only written for a real run
+    if not (dump_text or "").strip():
         st.error("Dump input is empty. Please paste a dump.")
     else:
-        # Robust logging: stash messages in session state
-        st.session_state.log_messages = []
+        tmp_dir = ROOT / ".streamlit_tmp"
+        dump_path = tmp_dir / "dump.txt"
+        # Encode once: the same bytes are written and hashed for the run cache
+        dump_bytes = dump_text.encode("utf-8")
+        try:
+            fh = open(dump_path, "wb", buffering=0)
+        except FileNotFoundError:
+            # `_ensure_dirs` only runs once per process; the folder may have been removed since
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            fh = open(dump_path, "wb", buffering=0)
+        with fh:
+            fh.write(dump_bytes)
+        # LLM answers of the current run (JSON lines keyed on the dump); cleared once a run succeeds
+        checkpoint = tmp_dir / "checkpoint.jsonl"
+        if not resume_runs:
+            checkpoint.unlink(missing_ok=True)
 
-        def ui_log(m: str) -> None:
-            st.session_state.log_messages.append(m)
+        # Robust logging: stash messages in session state
+        st.session_state.log_messages = deque(maxlen=LOG_MAX_LINES)
+        ui_log = st.session_state.log_messages.append
 
         result = None
 
@@ -130,14 +273,29 @@ if run:
                 )
 
                 try:
+                    # resolved fresh, after the env update: the preview is cached and, for an empty
+                    # field, may reflect the previous run's CODEFILL_FORCE_* fallback
                     dest_root = resolve_root_dir(base_dir, root_name)
                     with st.spinner("Parsing and generating project…"):
-                        result = codefill_run(
-                            dump_file=dump_path,
-                            root_dir=dest_root,
-                            mode=mode,
-                            logger=ui_log,
-                        )
+                        if reuse_runs:
+                            dump_digest = hashlib.sha256(dump_bytes).hexdigest()
+                            knobs = tuple(os.environ[k] for k in LLM_KNOBS)
+                            bundle = _parse_cached(
+                                dump_digest, dest_root.name, provider, knobs, dump_path, ui_log, checkpoint,
+                            )
+                            if not st.session_state.log_messages:
+                                ui_log("[cache] dump and settings unchanged; reused the parsed dump")
+                            result = codefill_write(bundle, dest_root, mode=mode, logger=ui_log)
+                        else:
+                            result = codefill_run(
+                                dump_file=dump_path,
+                                root_dir=dest_root,
+                                mode=mode,
+                                logger=ui_log,
+                                http_client=_http_client(provider),
+                                checkpoint=checkpoint,
+                            )
+                    checkpoint.unlink(missing_ok=True)
 
                     # Final flush
                     log_placeholder.text_area(
@@ -159,42 +317,74 @@ if run:
                     )
                     st.error(f"An unexpected error occurred during the run: {e}")
 
-        # Results panel
+        # Keep the run's outcome across reruns; the panel below renders from session state
         if result:
-            st.success(f"Project generation complete for `{dest_root}`")
-
-            # Quick actions row
-            a, b = st.columns([0.4, 0.6])
-            with a:
-                if st.button("🖥️ Open project in VS Code", key=button_key("open_after_run")):
-                    ok, msg = launch_editor(dest_root, prefer="vscode")
-                    (st.success if ok else st.error)(msg)
-            with b:
-                st.code(f"code {dest_root}", language="bash")
-
-            # Summary (counts)
-            counts = result.get("count", {})
-            if counts:
-                st.subheader("📊 Summary")
-                st.json(counts)
-
-            # File browser
-            st.subheader(f"🗂️ Generated Files in `{dest_root}`")
+            st.session_state.codefill_result = result
+            st.session_state.codefill_dest = str(dest_root)
             try:
-                files = sorted(_find_all_files(dest_root))
+                st.session_state.generated_files = _list_rel_files(dest_root)
             except Exception as e:
-                files = []
+                st.session_state.generated_files = []
                 st.error(f"Could not list files: {e}")
-
-            for p in files:
-                rel = p.relative_to(dest_root).as_posix()
-                with st.expander(rel):
-                    try:
-                        content = p.read_text(encoding="utf-8", errors="replace")
-                        lang = guess_language(p) or "text"
-                        st.code(content, language=lang)
-                    except Exception as e:
-                        st.error(f"Could not display file: {e}")
+            st.session_state.generated_shown = GENERATED_PAGE_SIZE
+            st.session_state.generated_html = None
+
+# Results panel
+if st.session_state.get("codefill_result"):
+    result = st.session_state.codefill_result
+    dest_root = Path(st.session_state.codefill_dest)
+    st.success(f"Project generation complete for `{dest_root}`")
+
+    # Quick actions row
+    a, b = st.columns([0.4, 0.6])
+    with a:
+        if st.button("🖥️ Open project in VS Code", key=button_key("open_after_run")):
+            ok, msg = launch_editor(dest_root, prefer="vscode")
+            (st.success if ok else st.error)(msg)
+    with b:
+        st.code(f"code {dest_root}", language="bash")
+
+    # Summary (counts)
+    counts = result.get("count", {})
+    if counts:
+        st.subheader("📊 Summary")
+        st.json(counts)
+
+    # File browser: listed once per run and shown a page at a time as ONE markdown element;
+    # the browser's <details> does the expand/collapse, so reruns don't re-send N expanders
+    files = st.session_state.get("generated_files", [])
+    shown = st.session_state.get("generated_shown", GENERATED_PAGE_SIZE)
+    page = files[:shown]
+    st.subheader(f"🗂️ Generated Files in `{dest_root}`")
+    cached = st.session_state.get("generated_html")
+    if not cached or cached[0] != shown:
+        cached = (shown, _details_html(page, _load_generated(dest_root, page)))
+        st.session_state.generated_html = cached
+    st.markdown(cached[1], unsafe_allow_html=True)
+    if len(files) > shown:
+        st.caption(f"Showing {shown} of {len(files)} files.")
+        if st.button("Load more", key=button_key("gen_load_more")):
+            st.session_state.generated_shown = shown + GENERATED_PAGE_SIZE
+            st.rerun()
+
+    # Full, highlighted view of one file at a time
+    pick = st.selectbox("Full view", ["—"] + page, key="gen_full_pick")
+    if pick != "—":
+        content, lang, size = _load_one(dest_root / pick)
+        if isinstance(content, Exception):
+            st.error(f"Could not display file: {content}")
+        elif len(content) > CODE_HIGHLIGHT_MAX_CHARS or size > VIEW_MAX_BYTES:
+            # past this size the browser-side highlighter can freeze the tab: plain + truncated
+            st.code(content[:CODE_HIGHLIGHT_MAX_CHARS] + f"\n…[truncated, {size} bytes total]", language=None)
+            # the full read only happens when asked for
+            if st.button("Load full file", key=button_key("gen_full", pick)):
+                full, _, _ = _load_one(dest_root / pick, None)
+                if isinstance(full, Exception):
+                    st.error(f"Could not read file: {full}")
+                else:
+                    st.download_button("Download full file", full, file_name=Path(pick).name, key=button_key("gen_dl", pick))
+        else:
+            st.code(content, language=lang)
 
 # # apps/streamlit_app.py
 # from __future__ import annotations
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Iterable, Optional, Tuple, Dict, List
+from typing import Callable, Iterable, Tuple, Dict, List, Set
 
+from .fsio import write_if_changed
 from .sanitize import ensure_under, sanitize_relpath
-from .groq_openai import llm_backfill_file, llm_extract_single_file
+from .groq_openai import llm_backfill_file, llm_extract_multi_files, llm_extract_single_file
 
 
 # Reuse the same heading/fence patterns as the normalizer.
@@ -19,37 +22,51 @@ FENCE_RE = re.compile(
     re.DOTALL,
 )
 
+# Files larger than this are never treated as stubs, so they are not read to check
+STUB_MAX_BYTES = 512
+# Missing files asked for per coalesced LLM extraction call; small, so a reply fits its
+# output budget (EXTRACT_TOKENS_PER_FILE each) and one truncated reply costs few fallbacks
+EXTRACT_BATCH_SIZE = 4
+
 WHITELIST_BARE_FILENAMES = {
     "Dockerfile", "README.md", "README", ".env", ".env.example",
     "docker-compose.yml", "requirements.txt", "pyproject.toml", ".gitignore",
 }
 
 
-def _extract_from_headings(raw: str, root: str, rel_path: str) -> Optional[str]:
+def _index_dump(raw: str, root: str) -> Dict[str, str]:
     """
-    Deterministically locate a file's code by scanning headings like:
+    Scan the dump once and map every file heading like:
         ## `app/main.py`
         ### app/main.py
-    followed immediately by a code fence.
+    to the code fence that follows it (before the next file heading).
+    Keys are the normalized path, plus the path without a leading "<root>/";
+    the first heading for a path wins.
     """
-    # accept both "rel" and "root/rel" headings
-    candidates = {rel_path, f"{root}/{rel_path}"}
-
+    heads: List[Tuple[str, int, int]] = []
     for m in HEADING_RE.finditer(raw):
         raw_path = m.group("q") or m.group("nq") or ""
         norm = sanitize_relpath(raw_path)
         if not norm:
             continue
-
         # If heading is bare filename, allow only in whitelist.
         if "/" not in norm and norm not in WHITELIST_BARE_FILENAMES:
             continue
-
-        if norm in candidates:
-            fence = FENCE_RE.search(raw, m.end())
-            if fence:
-                return fence.group(2).replace("\r\n", "\n")
-    return None
+        heads.append((norm, m.start(), m.end()))
+
+    index: Dict[str, str] = {}
+    prefix = f"{root}/"
+    for i, (norm, _, end) in enumerate(heads):
+        fence = FENCE_RE.search(raw, end)
+        if not fence:
+            break  # no fences left for this or any later heading
+        if i + 1 < len(heads) and fence.start() >= heads[i + 1][1]:
+            continue  # heading without a fence of its own
+        body = fence.group(2).replace("\r\n", "\n")
+        index.setdefault(norm, body)
+        if norm.startswith(prefix):
+            index.setdefault(norm[len(prefix):], body)
+    return index
 
 
 def _is_empty_or_stub(body: str) -> bool:
@@ -65,11 +82,13 @@ def _is_empty_or_stub(body: str) -> bool:
     return False
 
 
-def _write(path: Path, content: str, *, logger: Callable[[str], None] | None = None) -> None:
+def _write(path: Path, content: str, *, logger: Callable[[str], None] | None = None) -> bool:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    if not write_if_changed(path, content.encode("utf-8")):
+        return False
     if logger:
         logger(f"[audit] wrote: {path}")
+    return True
 
 
 def audit_and_fill(
@@ -84,8 +103,10 @@ def audit_and_fill(
     """
     For each declared relative file:
       1) If file is empty/stub → try to extract exactly from dump by path.
-      2) If not found → LLM single-file extraction (focused).
+      2) If not found → LLM extraction, batched EXTRACT_BATCH_SIZE paths per call,
+         with a single-file call only for paths whose batch reply failed or was cut off.
       3) If still not found → LLM backfill (contextual stub, but functional).
+    Steps 2-3 run on a thread pool (AUDIT_LLM_CONCURRENCY, default 8) once the deterministic pass is done.
     Also if file exists and differs from deterministic fence content, we replace with the fence content
     (verbatim wins).
     """
@@ -98,8 +119,10 @@ def audit_and_fill(
     # Normalize & de-dup in a stable order
     rel_list = sorted({p for p in declared_files if sanitize_relpath(p)})
 
-    # Build a quick cache for deterministic lookups to reduce LLM calls when many files point to same fence
-    fence_cache: Dict[str, Optional[str]] = {}
+    # One pass over the dump for every deterministic lookup
+    fences = _index_dump(raw_dump, root_name)
+    # (rel, target, had_content) of empty/stub files with no fence in the dump
+    needs_llm: List[Tuple[str, Path, bool]] = []
 
     for rel in rel_list:
         try:
@@ -110,61 +133,105 @@ def audit_and_fill(
                 logger(f"[audit] skip unsafe path: {rel}")
             continue
 
-        existing = target.read_text(encoding="utf-8") if target.exists() else ""
+        # a stat answers "exists / empty / too big to be a stub" without reading the file
+        try:
+            size = target.stat().st_size
+        except FileNotFoundError:
+            size = -1
 
         # 1) Deterministic fence lookup by path
-        if rel not in fence_cache:
-            fence_cache[rel] = _extract_from_headings(raw_dump, root_name, rel)
-        fence_content = fence_cache[rel]
+        fence_content = fences.get(rel)
 
         if fence_content and fence_content.strip():
-            if not target.exists():
+            # _write compares against the bytes on disk itself
+            if size < 0:
                 _write(target, fence_content, logger=logger)
                 created.append(rel)
-            elif existing != fence_content:
-                _write(target, fence_content, logger=logger)
+            elif _write(target, fence_content, logger=logger):
                 updated.append(rel)
             else:
                 unchanged.append(rel)
             continue
 
-        # 2) If deterministic failed → ask LLM for this file specifically
-        if _is_empty_or_stub(existing):
+        # 2)/3) need the LLM: collected and resolved concurrently below
+        if size <= 0 or (
+            size <= STUB_MAX_BYTES
+            and _is_empty_or_stub(target.read_text(encoding="utf-8", errors="replace"))
+        ):
+            needs_llm.append((rel, target, size > 0))
+        else:
+            # File exists with non-empty content but no deterministic match; leave as-is
+            unchanged.append(rel)
+
+    # bodies returned by the coalesced extraction calls, and the paths whose answer was lost
+    extracted: Dict[str, str] = {}
+    retry: Set[str] = set()
+
+    def _extract_many(rels: List[str]) -> Tuple[Dict[str, str], Set[str]]:
+        lost: Set[str] = set()
+        try:
+            return llm_extract_multi_files(raw_dump, rels, provider=provider, lost=lost), lost
+        except Exception as e:
+            if logger:
+                logger(f"[audit] llm_extract_multi_files error for {len(rels)} files: {e}")
+            return {}, set(rels)
+
+    def _resolve_one(item: Tuple[str, Path, bool]) -> bool:
+        rel, target, _ = item
+        # 2) If deterministic failed → LLM extraction; a path the batch answered "not found"
+        #    goes straight to backfill, only a lost answer is asked for again
+        body = extracted.get(rel, "")
+        if not body and rel in retry:
             try:
-                llm_body = llm_extract_single_file(raw_dump, rel, provider=provider)
+                body = llm_extract_single_file(raw_dump, rel, provider=provider)
             except Exception as e:
-                llm_body = ""
+                body = ""
                 if logger:
                     logger(f"[audit] llm_extract_single_file error for {rel}: {e}")
 
-            if llm_body and llm_body.strip():
-                _write(target, llm_body, logger=logger)
-                (created if not existing else updated).append(rel)
-                llm_filled.append(rel)
-                continue
-
-            # 3) Fallback → LLM backfill
+        # 3) Fallback → LLM backfill
+        if not (body and body.strip()):
             try:
-                backfill = llm_backfill_file(
+                body = llm_backfill_file(
                     rel,
                     hint="Create a minimal, working file consistent with the project.",
                     provider=provider,
                     context=raw_dump,
                 )
             except Exception as e:
-                backfill = ""
+                body = ""
                 if logger:
                     logger(f"[audit] llm_backfill_file error for {rel}: {e}")
 
-            if backfill.strip():
-                _write(target, backfill, logger=logger)
-                (created if not existing else updated).append(rel)
+        if not body.strip():
+            return False
+        # write from the worker so disk I/O overlaps the other requests' waits
+        _write(target, body, logger=logger)
+        return True
+
+    if needs_llm:
+        # files are independent network round-trips; map() keeps the reporting order stable
+        workers = max(1, min(int(os.getenv("AUDIT_LLM_CONCURRENCY", "8")), len(needs_llm)))
+        if logger:
+            logger(f"[audit] llm files={len(needs_llm)} concurrency={workers}")
+        rels = [item[0] for item in needs_llm]
+        batches = [rels[i:i + EXTRACT_BATCH_SIZE] for i in range(0, len(rels), EXTRACT_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for got, lost in ex.map(_extract_many, batches):
+                extracted.update(got)
+                retry.update(lost)
+            if logger:
+                logger(
+                    f"[audit] batched extract: {len(extracted)}/{len(rels)} files in {len(batches)} calls"
+                    f", {len(retry)} to retry singly"
+                )
+            filled = list(ex.map(_resolve_one, needs_llm))
+        for (rel, _, had_content), ok in zip(needs_llm, filled):
+            if ok:
+                (updated if had_content else created).append(rel)
                 llm_filled.append(rel)
             else:
                 failed.append(rel)
-        else:
-            # File exists with non-empty content but no deterministic match; leave as-is
-            unchanged.append(rel)
 
     return {
         "created": created,
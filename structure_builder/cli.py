@@ -49,6 +49,10 @@ def main(argv=None):
         print(f"Skipped ({len(result.skipped)}):")
         for p in result.skipped:
             print(f"  · {p.relative_to(result.root_dir)}")
+    if result.unchanged:
+        print(f"Unchanged ({len(result.unchanged)}):")
+        for p in result.unchanged:
+            print(f"  = {p.relative_to(result.root_dir)}")
     if result.warnings:
         print("\nWarnings:")
         for w in result.warnings:
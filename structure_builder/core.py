@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import subprocess
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
+from itertools import chain
 from pathlib import Path
 from typing import Callable, List, Optional
 
+from .fsio import write_if_changed
 from .sanitize import ensure_under
 from .llm_normalizer import normalize_and_maybe_llm, NormalizedDump
 from .audit import audit_and_fill
@@ -27,22 +29,29 @@ class BuildResult:
     created: List[Path]
     skipped: List[Path]
     warnings: List[str]
+    unchanged: List[Path] = field(default_factory=list)  # overwrite mode, bytes already identical
 
     def __str__(self) -> str:  # nice for Streamlit
-        return f"root={self.root_dir.name}, created={len(self.created)}, skipped={len(self.skipped)}, warnings={len(self.warnings)}"
+        return (f"root={self.root_dir.name}, created={len(self.created)}, skipped={len(self.skipped)}, "
+                f"unchanged={len(self.unchanged)}, warnings={len(self.warnings)}")
 
 
-def _write_file(path: Path, body: str, if_exists: str) -> bool:
+def _write_file(path: Path, body: str, if_exists: str) -> str:
+    """Write one declared file; returns "created", "skipped" (exists, skip mode) or "unchanged"."""
     path.parent.mkdir(parents=True, exist_ok=True)
     if path.exists() and if_exists == "skip":
-        return False
-    path.write_text(body or "", encoding="utf-8")
-    return True
+        return "skipped"
+    return "created" if write_if_changed(path, (body or "").encode("utf-8")) else "unchanged"
 
 
-def _run(cmd: List[str], cwd: Path, logger: Callable[[str], None] | None):
+async def _run(cmd: List[str], cwd: Path, logger: Callable[[str], None] | None) -> None:
     try:
-        subprocess.run(cmd, cwd=str(cwd), check=True, capture_output=True)
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, cwd=str(cwd), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"exit status {proc.returncode}")
         if logger:
             logger(f"[post] {' '.join(cmd)}")
     except Exception as e:
@@ -50,6 +59,20 @@ def _run(cmd: List[str], cwd: Path, logger: Callable[[str], None] | None):
             logger(f"[post] failed: {' '.join(cmd)} -> {e}")
 
 
+async def _post_build(root_dir: Path, opts: BuildOptions, logger: Callable[[str], None] | None) -> None:
+    # black and `git init` don't depend on each other: run them side by side;
+    # add/commit wait for both so the commit holds the formatted files
+    first = []
+    if opts.use_black:
+        first.append(_run(["python", "-m", "black", "."], cwd=root_dir, logger=logger))
+    if opts.git_init:
+        first.append(_run(["git", "init"], cwd=root_dir, logger=logger))
+    await asyncio.gather(*first)
+    if opts.git_init:
+        await _run(["git", "add", "-A"], cwd=root_dir, logger=logger)
+        await _run(["git", "commit", "-m", "Initial scaffold from Structure Builder"], cwd=root_dir, logger=logger)
+
+
 def build_from_text(
     raw: str,
     dest_folder: str | Path,
@@ -101,18 +124,20 @@ def build_from_text(
 
     created: List[Path] = []
     skipped: List[Path] = []
+    unchanged: List[Path] = []
 
     # Ensure directories
     for d in dump.tree_dirs:
         (root_dir / d).mkdir(parents=True, exist_ok=True)
 
     # Write declared files (both from ascii tree & from headings/LLM)
-    declared_files = sorted(set(list(dump.tree_files) + list(dump.files_out.keys())))
+    # one-pass dedup in declaration order (tree first); audit_and_fill sorts its own copy
+    declared_files = list(dict.fromkeys(chain(dump.tree_files, dump.files_out)))
     for rel in declared_files:
         tgt = ensure_under(root_dir, rel)
         body = dump.files_out.get(rel, "")
-        wrote = _write_file(tgt, body, opts.if_exists)
-        (created if wrote else skipped).append(tgt)
+        status = _write_file(tgt, body, opts.if_exists)
+        {"created": created, "skipped": skipped, "unchanged": unchanged}[status].append(tgt)
 
     # ---- NEW: post-build audit (deterministic match → per-file LLM → backfill) ----
     if opts.verify_with_llm:
@@ -134,11 +159,9 @@ def build_from_text(
                    f"failed={len(audit_stats['failed'])}")
 
     # Post actions
-    if opts.use_black:
-        _run(["python", "-m", "black", "."], cwd=root_dir, logger=logger)
-    if opts.git_init:
-        _run(["git", "init"], cwd=root_dir, logger=logger)
-        _run(["git", "add", "-A"], cwd=root_dir, logger=logger)
-        _run(["git", "commit", "-m", "Initial scaffold from Structure Builder"], cwd=root_dir, logger=logger)
+    if opts.use_black or opts.git_init:
+        asyncio.run(_post_build(root_dir, opts, logger))
 
-    return BuildResult(root_dir=root_dir, created=created, skipped=skipped, warnings=dump.warnings)
+    return BuildResult(
+        root_dir=root_dir, created=created, skipped=skipped, warnings=dump.warnings, unchanged=unchanged
+    )
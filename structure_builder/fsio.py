@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import os
+import stat
+import threading
+from pathlib import Path
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Atomically write `data` to `path` unless the file already holds exactly these bytes.
+    Returns True when the file was written. Parent directories must exist.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        st = None
+    # different size means different content; only a same-size file is read back and compared
+    if st is not None and st.st_size == len(data):
+        with open(path, "rb", buffering=0) as fh:
+            if fh.read() == data:
+                return False
+    # write a sibling temp file and rename it over the target: readers never see a partial
+    # file, and concurrent writers (parallel audit) can't interleave into one file
+    tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+    try:
+        # one unbuffered write of the encoded body (no text-layer copy)
+        with open(tmp, "wb", buffering=0) as fh:
+            fh.write(data)
+        if st is not None:
+            # the new inode would get umask defaults: keep the target's mode (e.g. +x on scripts)
+            os.chmod(tmp, stat.S_IMODE(st.st_mode))
+        os.replace(tmp, path)
+    finally:
+        # only still there if the write, chmod or rename failed
+        tmp.unlink(missing_ok=True)
+    return True
@@ -5,7 +5,7 @@ import os
 import re
 import time
 import datetime as _dt
-from typing import Dict, List, Optional, Tuple, Callable
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import requests
 
@@ -254,6 +254,78 @@ def llm_extract_single_file(
         _llm_log(f"[LLM error] legacy_extract_single path={rel_path}: {e!r}", logger)
         return ""
 
+# Output tokens budgeted per requested file in llm_extract_multi_files (capped at 8000 per call)
+EXTRACT_TOKENS_PER_FILE = 2000
+
+def _salvage_json_strings(s: str, keys: List[str]) -> Dict[str, str]:
+    """`"key": "value"` pairs that are complete in a (possibly truncated) JSON object text."""
+    dec = json.JSONDecoder()
+    out: Dict[str, str] = {}
+    for k in keys:
+        m = re.search(re.escape(json.dumps(k)) + r"\s*:\s*", s)
+        if not m:
+            continue
+        try:
+            v, _ = dec.raw_decode(s, m.end())
+        except json.JSONDecodeError:
+            continue  # this value was cut off
+        if isinstance(v, str):
+            out[k] = v
+    return out
+
+def llm_extract_multi_files(
+    raw_text: str,
+    rel_paths: List[str],
+    provider: str = "groq",
+    *,
+    logger: Optional[LogFn] = None,
+    lost: Optional[Set[str]] = None,
+) -> Dict[str, str]:
+    """
+    Extract several files in one call; the dump context is sent (and paid for) once per batch.
+    The output budget scales with the batch, and a truncated reply still yields the files it completed.
+    `lost` receives the paths whose answer never arrived (failed call or cut-off reply); a path left
+    out of a complete reply was deliberately omitted (not in the dump) and is not added.
+    """
+    provider = _provider_from_env(provider)
+    if not _have_keys(provider) or not rel_paths:
+        return {}
+    sys = (
+        "You are a precise file extractor. Given a project dump and a list of relative paths, "
+        "return a single JSON object mapping each path to its file body exactly as found within a code fence. "
+        "Omit paths that are not found. Do not add markdown fences or any other text."
+    )
+    if len(raw_text) > 12000:
+        raw_text = raw_text[:12000]
+    usr = (
+        "PATHS:\n" + "\n".join(f"- {p}" for p in rel_paths)
+        + f"\n\n--- DUMP START ---\n{raw_text}\n--- DUMP END ---"
+    )
+    try:
+        response_str = _chat(
+            provider,
+            [{"role": "system", "content": sys}, {"role": "user", "content": usr}],
+            json_mode=True,
+            max_tokens=min(8000, EXTRACT_TOKENS_PER_FILE * len(rel_paths)),
+            logger=logger,
+            tag=f"extract_multi:{len(rel_paths)}",
+        )
+    except Exception as e:
+        _llm_log(f"[LLM error] extract_multi paths={len(rel_paths)}: {e!r}", logger)
+        if lost is not None:
+            lost.update(rel_paths)
+        return {}
+    response_json = _extract_json_object(response_str)
+    if isinstance(response_json, dict):
+        wanted = set(rel_paths)
+        got = {k: v for k, v in response_json.items() if isinstance(k, str) and isinstance(v, str) and k in wanted}
+    else:
+        got = _salvage_json_strings(response_str, rel_paths)
+        if lost is not None:
+            lost.update(p for p in rel_paths if p not in got)
+        _llm_log(f"[LLM warn] extract_multi reply not valid JSON; kept {len(got)}/{len(rel_paths)} complete files", logger)
+    return {k: v.strip() for k, v in got.items() if v.strip()}
+
 def llm_backfill_file(
     path: str,
     hint: str = "",
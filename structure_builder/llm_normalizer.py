@@ -1,10 +1,14 @@
 # structure_builder/llm_normalizer.py
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
 from tools.llm_client import LLMClient
 
@@ -82,8 +86,8 @@ Rules:
 """
 
 
-def _client() -> LLMClient:
-    return LLMClient()
+def _client(http_client=None) -> LLMClient:
+    return LLMClient(http_client=http_client)
 
 def _truncate_dump(dump_text: str) -> str:
     max_chars = int(os.getenv("LLM_MAX_CHARS", "90000"))
@@ -97,14 +101,14 @@ def _chunk(lst: List[str], n: int) -> List[List[str]]:
     return [lst[i:i+n] for i in range(0, len(lst), n)]
 
 
-def llm_extract_file_list(dump_text: str, logger=print) -> Tuple[str, List[str]]:
+def llm_extract_file_list(dump_text: str, logger=print, http_client=None) -> Tuple[str, List[str]]:
     dump_text = _truncate_dump(dump_text)
-    client = _client()
     messages = [
         {"role": "system", "content": SYSTEM_LIST},
         {"role": "user", "content": USER_LIST_TEMPLATE.format(dump=dump_text)},
     ]
-    obj = client.chat_json(messages)
+    with _client(http_client) as client:
+        obj = client.chat_json(messages)
     if not isinstance(obj, dict) or "files" not in obj:
         raise RuntimeError(f"LLM did not return expected list JSON: {obj}")
     root = (obj.get("root") or "").strip()
@@ -115,17 +119,32 @@ def llm_extract_file_list(dump_text: str, logger=print) -> Tuple[str, List[str]]
     return root, files
 
 
-def llm_extract_file_blobs(dump_text: str, files: List[str], logger=print) -> List[Dict[str, str]]:
+def llm_extract_file_blobs(
+    dump_text: str,
+    files: List[str],
+    logger=print,
+    http_client=None,
+    done: Optional[Dict[str, str]] = None,
+    on_batch: Optional[Callable[[Dict[str, str]], None]] = None,
+) -> List[Dict[str, str]]:
+    """
+    `done` holds bodies recovered from a checkpoint (those paths are not sent again);
+    `on_batch` is called with each batch's results as soon as it arrives.
+    """
     dump_text = _truncate_dump(dump_text)
-    client = _client()
     # Smaller default batch to avoid TPM spikes; can override via env.
     max_batch = int(os.getenv("LLM_MAX_BATCH", "6"))
-    all_results: Dict[str, str] = {}
-
-    batches = _chunk(files, max_batch)
-    _writeln(f"[norm:blobs] total_files={len(files)} batches={len(batches)} batch_size={max_batch}")
+    all_results: Dict[str, str] = dict(done or {})
+
+    batches = _chunk([f for f in files if f not in all_results], max_batch)
+    # Batches are independent requests; LLMClient spaces their start times by LLM_THROTTLE_MS
+    concurrency = max(1, min(int(os.getenv("LLM_CONCURRENCY", "1")), len(batches) or 1))
+    _writeln(
+        f"[norm:blobs] total_files={len(files)} batches={len(batches)} batch_size={max_batch} "
+        f"concurrency={concurrency}"
+    )
 
-    for idx, batch in enumerate(batches, start=1):
+    def _send(idx: int, batch: List[str]) -> Dict[str, str]:
         payload = {"files": [{"path": p} for p in batch]}
         messages = [
             {"role": "system", "content": SYSTEM_BLOBS},
@@ -139,16 +158,29 @@ def llm_extract_file_blobs(dump_text: str, files: List[str], logger=print) -> Li
         if not isinstance(obj, dict) or "files" not in obj:
             raise RuntimeError(f"LLM did not return expected blobs JSON: {obj}")
 
-        received = 0
+        got: Dict[str, str] = {}
         for item in obj["files"]:
             path = (item.get("path") or "").strip().lstrip("./").lstrip("/")
-            content = item.get("content") or ""
             if path:
-                all_results[path] = content
-                received += 1
-
-        _writeln(f"[norm:blobs] batch {idx} received={received}")
-        logger and logger(f"[llm:blobs] batch={idx}/{len(batches)} -> received={received}")
+                got[path] = item.get("content") or ""
+
+        _writeln(f"[norm:blobs] batch {idx} received={len(got)}")
+        logger and logger(f"[llm:blobs] batch={idx}/{len(batches)} -> received={len(got)}")
+        if on_batch:
+            on_batch(got)
+        return got
+
+    numbers = range(1, len(batches) + 1)
+    # one client for every batch; its own connection pool (if any) is closed when done
+    with _client(http_client) as client:
+        if concurrency == 1:
+            results = [_send(idx, batch) for idx, batch in zip(numbers, batches)]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as ex:
+                results = list(ex.map(_send, numbers, batches))
+    # merge in batch order, so a path repeated in a later batch wins as it did sequentially
+    for got in results:
+        all_results.update(got)
 
     return [{"path": p, "content": all_results.get(p, "")} for p in files]
 
@@ -157,12 +189,63 @@ def llm_extract_file_blobs(dump_text: str, files: List[str], logger=print) -> Li
 # Public API
 # -----------------------------
 
-def parse_dump_bundle(raw_dump: str, root_hint: Optional[str] = None, logger=print) -> Dict[str, object]:
-    root, files = llm_extract_file_list(raw_dump, logger=logger)
+def _load_checkpoint(path: Path, key: str) -> Tuple[Optional[Tuple[str, List[str]]], Dict[str, str]]:
+    """(file list, bodies) recorded for this dump by an earlier, possibly interrupted, run."""
+    listing: Optional[Tuple[str, List[str]]] = None
+    bodies: Dict[str, str] = {}
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by the interruption
+                if rec.get("dump") != key:
+                    continue
+                if rec.get("kind") == "list":
+                    listing = (rec.get("root") or "", list(rec.get("files") or []))
+                elif rec.get("kind") == "blob":
+                    bodies[rec["path"]] = rec.get("content") or ""
+    except OSError:
+        pass
+    return listing, bodies
+
+
+def parse_dump_bundle(
+    raw_dump: str,
+    root_hint: Optional[str] = None,
+    logger=print,
+    http_client=None,
+    checkpoint: Optional[Path] = None,
+) -> Dict[str, object]:
+    """
+    With `checkpoint`, every LLM answer is appended there (JSON lines keyed on the dump's sha256)
+    and answers already recorded for the same dump are reused instead of being requested again.
+    """
+    key = hashlib.sha256(raw_dump.encode("utf-8")).hexdigest()
+    listing, done = _load_checkpoint(checkpoint, key) if checkpoint else (None, {})
+    lock = threading.Lock()
+
+    def _record(recs: List[Dict[str, object]]) -> None:
+        if not checkpoint:
+            return
+        with lock, checkpoint.open("a", encoding="utf-8", buffering=1 << 16) as f:
+            for rec in recs:
+                f.write(json.dumps({"dump": key, **rec}, ensure_ascii=False) + "\n")
+
+    if listing is not None:
+        root, files = listing
+        logger and logger(f"[resume] file list from checkpoint; {len(done)} file bodies already done")
+    else:
+        root, files = llm_extract_file_list(raw_dump, logger=logger, http_client=http_client)
+        _record([{"kind": "list", "root": root, "files": files}])
     if not root and root_hint:
         root = root_hint
 
-    blobs = llm_extract_file_blobs(raw_dump, files, logger=logger)
+    blobs = llm_extract_file_blobs(
+        raw_dump, files, logger=logger, http_client=http_client, done=done,
+        on_batch=lambda got: _record([{"kind": "blob", "path": p, "content": c} for p, c in got.items()]),
+    )
 
     return {
         "root": root or (root_hint or "generated-project"),
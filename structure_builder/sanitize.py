@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -48,12 +49,22 @@ def looks_like_text(content: str) -> bool:
     # too short to be useful
     return len(txt.strip()) >= 1
 
+@lru_cache(maxsize=64)
+def _resolved_base(abs_base: str) -> Path:
+    """
+    Canonical form of an absolute base path. A build joins hundreds of files onto the same
+    base, so it is resolved once, not per file. Keyed on the absolute path, so a chdir can't
+    serve a stale answer for a relative base; a symlink along the base that is re-pointed
+    after the first call is not noticed for the life of the process.
+    """
+    return Path(abs_base).resolve()
+
 def ensure_under(base: str | Path, rel: str | Path) -> Path:
     """
     Join base + rel, resolve, and assert the result stays under base.
     Accepts strings, returns Path.
     """
-    base_p = Path(base).expanduser().resolve()
+    base_p = _resolved_base(os.path.abspath(os.path.expanduser(base)))
     target = (base_p / Path(rel)).resolve()
     # Python 3.11 Path has is_relative_to
     if not target.is_relative_to(base_p):
@@ -10,25 +10,42 @@ from typing import Dict, List, Optional, Tuple
 # Local universal dump parser
 from structure_builder.llm_normalizer import parse_dump_bundle
 
-__all__ = ["codefill_run", "resolve_root_dir", "_find_all_files"]
+__all__ = ["codefill_run", "codefill_parse", "codefill_write", "resolve_root_dir", "_find_all_files", "_list_rel_files"]
 
 # ---------- Small helpers ----------
 def _safe_normalize(s: str) -> str:
     return (s or "").replace("\r\n", "\n").replace("\r", "\n").replace("\x00", "")
 
-def _find_all_files(root_dir: Path) -> List[Path]:
-    items: List[Path] = []
-    for p in root_dir.rglob("*"):
-        if p.is_dir():
-            # Skip obvious noise dirs
-            if p.name in {"__pycache__", ".git", ".mypy_cache", ".venv", "node_modules"}:
-                continue
-            continue
-        rel = p.relative_to(root_dir).as_posix()
-        if rel.startswith(".git/"):
+# Noise directories pruned from the generated-file listing
+_SKIP_DIRS = {"__pycache__", ".git", ".mypy_cache", ".venv", "node_modules"}
+
+def _list_rel_files(root_dir: Path) -> List[str]:
+    """Sorted posix paths of every file under root_dir; noise dirs are never descended into."""
+    items: List[str] = []
+    # scandir stack: DirEntry knows its type, so there is no extra stat per path
+    stack = [(str(root_dir), "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
             continue
-        items.append(p)
-    return sorted(items)
+        with it:
+            for entry in it:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            stack.append((entry.path, rel))
+                        continue
+                except OSError:
+                    continue
+                items.append(rel)
+    items.sort()
+    return items
+
+def _find_all_files(root_dir: Path) -> List[Path]:
+    return [root_dir / rel for rel in _list_rel_files(root_dir)]
 
 def _should_write(existing: Optional[str], new: str, mode: str) -> bool:
     if existing is None:
@@ -70,13 +87,28 @@ def codefill_run(
     mode: str = "overwrite",
     create_missing: bool = True,
     logger = print,
+    http_client = None,
+    checkpoint: Optional[Path] = None,
 ) -> Dict[str, object]:
     """
     Universal project builder:
       1) Parse the pasted dump into {root, files[], dirs[]}
       2) Write discovered files (respecting mode)
       3) Optionally create placeholders for tree-only files
+    `http_client` (optional httpx.Client) is reused for every LLM call of the run.
+    `checkpoint` (optional JSONL path) records LLM answers so an interrupted run can resume.
     """
+    bundle = codefill_parse(dump_file, root_dir.name, logger=logger, http_client=http_client, checkpoint=checkpoint)
+    return codefill_write(bundle, root_dir, mode=mode, create_missing=create_missing, logger=logger)
+
+def codefill_parse(
+    dump_file: Path,
+    root_hint: str,
+    logger = print,
+    http_client = None,
+    checkpoint: Optional[Path] = None,
+) -> Dict[str, object]:
+    """Step 1 only: the parsed bundle. Pure data (no files written), so callers may memoize it."""
     if not dump_file.exists():
         raise FileNotFoundError(f"Dump file not found: {dump_file}")
 
@@ -84,8 +116,18 @@ def codefill_run(
     logger(f"[step] read_dump: ok ({len(raw_dump)} chars)")
 
     # Pass through to the universal parser/normalizer
-    bundle = parse_dump_bundle(raw_dump, root_hint=root_dir.name, logger=logger)
+    return parse_dump_bundle(
+        raw_dump, root_hint=root_hint, logger=logger, http_client=http_client, checkpoint=checkpoint,
+    )
 
+def codefill_write(
+    bundle: Dict[str, object],
+    root_dir: Path,
+    mode: str = "overwrite",
+    create_missing: bool = True,
+    logger = print,
+) -> Dict[str, object]:
+    """Steps 2-3: write a parsed bundle under root_dir and return the run summary."""
     # If the parser suggests a different root folder, adopt it under the selected base dir
     suggested_root = (bundle.get("root") or "").strip()
     if suggested_root and suggested_root != root_dir.name:
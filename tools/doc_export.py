@@ -1,10 +1,13 @@
 # tools/doc_export.py
 from __future__ import annotations
 
+import hashlib
 import io
+import os
 import re
+import shutil
 import zipfile
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
 
 # Optional docx dependency
 try:
@@ -21,22 +24,44 @@ LANG_LABEL = {
     "sql": "sql", "protobuf": "protobuf", "docker": "docker",
 }
 
+Reader = Callable[[Dict], Any]
+
 def fence(lang: str) -> str:
     return LANG_LABEL.get((lang or "text").lower(), "")
 
-def build_markdown_document(files: List[Dict], title: str, base_path: str) -> str:
-    parts = [f"# {title}", "", f"_Base:_ `{base_path}`", ""]
+def _content(f: Dict, reader: Optional[Reader]) -> Any:
+    # metadata-only records are read one at a time, right when they are written
+    return reader(f) if reader is not None else f.get("content", "")
+
+def iter_markdown_document(
+    files: List[Dict],
+    title: str,
+    base_path: str,
+    reader: Optional[Reader] = None,
+    dedupe: bool = False,
+) -> Iterator[bytes]:
+    """
+    The Markdown export as UTF-8 chunks, one file at a time, so no full-document str is built.
+    With `dedupe`, a file whose bytes match an earlier one gets a pointer instead of its content.
+    """
+    yield f"# {title}\n\n_Base:_ `{base_path}`\n".encode("utf-8")
+    seen: Dict[bytes, str] = {}
     for f in files:
         lang = fence(f.get("language") or "text")
         rel = f.get("rel_path", "")
-        parts.append(f"## `{rel}`")
-        parts.append("")
-        parts.append(f"```{lang}".rstrip())
-        parts.append(f.get("content", ""))
-        parts.append("```")
-        parts.append("")  # spacer
-    return "\n".join(parts)
-
+        body = (_content(f, reader) or "").encode("utf-8", errors="replace")
+        if dedupe and body:  # empty files (__init__.py) are not worth a pointer
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            first = seen.setdefault(digest, rel)
+            if first != rel:
+                yield f"\n## `{rel}`\n\n> duplicate of `{first}`\n".encode("utf-8")
+                continue
+        yield f"\n## `{rel}`\n\n{f'```{lang}'.rstrip()}\n".encode("utf-8")
+        yield body
+        yield b"\n```\n"
+
+def build_markdown_document(files: List[Dict], title: str, base_path: str, reader: Optional[Reader] = None) -> str:
+    return b"".join(iter_markdown_document(files, title, base_path, reader)).decode("utf-8")
 
 # -----------------------------
 # XML-safe DOCX export helpers
@@ -55,7 +80,7 @@ def _xml_safe_text(text: Any) -> str:
     return _XML_INVALID.sub(" ", text)
 
 
-def build_docx_document(files: List[Dict], title: str) -> Optional[bytes]:
+def build_docx_document(files: List[Dict], title: str, reader: Optional[Reader] = None) -> Optional[bytes]:
     """
     Build a .docx with headings per file and code-like body text.
     This is resilient to binary/garbled inputs by sanitizing text before writing.
@@ -70,7 +95,7 @@ def build_docx_document(files: List[Dict], title: str) -> Optional[bytes]:
         rel = f.get("rel_path") or f.get("path") or f.get("name") or "File"
         doc.add_heading(str(rel), level=1)
 
-        raw = f.get("content", "")
+        raw = _content(f, reader)
         safe = _xml_safe_text(raw)
 
         if not safe and raw:
@@ -87,14 +112,29 @@ def build_docx_document(files: List[Dict], title: str) -> Optional[bytes]:
     return bio.getvalue()
 
 
-def build_zip_of_sources(files: List[Dict]) -> bytes:
+def build_zip_of_sources(
+    files: List[Dict],
+    fp: Optional[BinaryIO] = None,
+    compresslevel: Optional[int] = None,
+    reader: Optional[Reader] = None,
+    compression: int = zipfile.ZIP_DEFLATED,
+) -> Optional[bytes]:
     """
     Build a zip of the (selected) file contents. Accepts str or bytes content.
+    When `fp` is given the archive is streamed into it and None is returned;
+    otherwise the archive bytes are returned.
     """
-    bio = io.BytesIO()
-    with zipfile.ZipFile(bio, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+    target = fp if fp is not None else io.BytesIO()
+    with zipfile.ZipFile(target, "w", compression=compression, compresslevel=compresslevel) as zf:
         for f in files:
             rel = f.get("rel_path", "file.txt")
-            content = f.get("content", "")
-            zf.writestr(rel, content)
-    return bio.getvalue()
+            src = f.get("abs_path") or ""
+            if reader is None and f.get("content") is None and os.path.isfile(src):
+                # metadata-only record: copy the original bytes through in 64 KB chunks
+                with open(src, "rb") as fin, zf.open(rel, "w") as fout:
+                    shutil.copyfileobj(fin, fout, 64 * 1024)
+                continue
+            zf.writestr(rel, _content(f, reader))
+    if fp is not None:
+        return None
+    return target.getvalue()
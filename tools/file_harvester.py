@@ -1,7 +1,13 @@
 from __future__ import annotations
+import codecs
+import mmap
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Pattern
 
 TEXT_EXTS = {
     ".py", ".txt", ".md", ".yaml", ".yml", ".json", ".toml", ".ini",
@@ -40,12 +46,24 @@ LANG_FROM_EXT = {
     ".dockerfile": "docker",
 }
 
+@lru_cache(maxsize=512)
+def _lang_for_suffix(suffix: str) -> str:
+    return LANG_FROM_EXT.get(suffix, "text")
+
 def guess_language(path: Path) -> str:
     name = path.name.lower()
     if name == "dockerfile":
         return "docker"
-    ext = path.suffix.lower()
-    return LANG_FROM_EXT.get(ext, "text")
+    return _lang_for_suffix(path.suffix.lower())
+
+# Interpreter named on a "#!" first line (covers "/usr/bin/env python3" too)
+_SHEBANG_RE = re.compile(rb"^#![^\n]*?\b(python|bash|zsh|sh|node)[\d.]*\b")
+_LANG_FROM_INTERPRETER = {b"python": "python", b"bash": "bash", b"zsh": "bash", b"sh": "bash", b"node": "javascript"}
+
+def language_from_shebang(head: bytes) -> Optional[str]:
+    """Language of an extensionless script from its first bytes, or None."""
+    m = _SHEBANG_RE.match(head)
+    return _LANG_FROM_INTERPRETER[m.group(1)] if m else None
 
 def looks_textual(path: Path) -> bool:
     name = path.name.lower()
@@ -53,13 +71,35 @@ def looks_textual(path: Path) -> bool:
         return True
     return path.suffix.lower() in TEXT_EXTS
 
-def should_exclude(rel_path: str, exclude_tokens: List[str], include_hidden: bool) -> bool:
+def compile_excludes(exclude_tokens: List[str]) -> Optional[Pattern[str]]:
+    """One case-insensitive alternation for all tokens (None when there are none)."""
+    return _compile_excludes(tuple(t for t in exclude_tokens if t))
+
+@lru_cache(maxsize=32)
+def _compile_excludes(toks: tuple) -> Optional[Pattern[str]]:
+    # reruns pass the same tokens, so the join/escape/compile happens once per token set
+    if not toks:
+        return None
+    return re.compile("|".join(map(re.escape, toks)), re.IGNORECASE)
+
+# A path segment that starts with "." (either separator, for zip entries and Windows paths);
+# a bare "." segment (e.g. "./src") is not hidden, matching Path.parts
+_HIDDEN_SEGMENT_RE = re.compile(r"(?:^|[/\\])\.(?![/\\]|$)")
+
+def should_exclude(
+    rel_path: str,
+    exclude_tokens: List[str],
+    include_hidden: bool,
+    exclude_re: Optional[Pattern[str]] = None,
+) -> bool:
     p = rel_path
     if not include_hidden:
         # skip hidden files or any segment starting with .
-        if any(seg.startswith(".") for seg in Path(p).parts):
+        if _HIDDEN_SEGMENT_RE.search(p):
             return True
-    # token contains match
+    # token contains match; a precompiled pattern does it in a single pass
+    if exclude_re is not None:
+        return exclude_re.search(p) is not None
     p_lower = p.lower()
     for tok in exclude_tokens:
         if tok.lower() in p_lower:
@@ -78,33 +118,140 @@ def read_text_safe(path: Path, max_bytes: int) -> str | None:
     except Exception:
         return None
 
-def harvest_folder(base_dir: Path, max_bytes: int, exclude_tokens: List[str], include_hidden: bool) -> List[Dict]:
-    out: List[Dict] = []
-    for fs_path in base_dir.rglob("*"):
-        if fs_path.is_dir():
-            continue
-        rel = os.path.relpath(fs_path, base_dir)
-        if should_exclude(rel, exclude_tokens, include_hidden):
+def default_workers() -> int:
+    return min(32, (os.cpu_count() or 1) * 4)
+
+# Bytes probed (NUL byte, valid UTF-8) before the rest of a file is read
+SNIFF_BYTES = 4096
+# Below this many candidate files the reads run inline instead of on a thread pool
+PARALLEL_MIN_FILES = 4
+# Files at least this large are decoded from an mmap instead of being read into bytes first
+MMAP_MIN_BYTES = 64 * 1024
+
+def _utf8_head_ok(head: bytes, final: bool = False) -> bool:
+    # incremental decode: a multi-byte sequence cut off at the probe boundary is not an error,
+    # unless the head is the whole file (`final`), where a trailing partial sequence is invalid
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def _decode_mapped(f, errors: str = "strict") -> str:
+    # decode straight from the page cache: no intermediate bytes copy of the file
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return str(mm, "utf-8", errors)
+
+def _read_one(
+    fs_path: Path, rel: str, size: int, mtime_ns: int, max_bytes: int, with_content: bool = True
+) -> Optional[Dict]:
+    content = None
+    try:
+        # size is known from the walk: sniff the head, then read the rest (or map it when large)
+        with open(fs_path, "rb", buffering=0) as f:
+            head = f.read(SNIFF_BYTES)
+            if b"\x00" in head or not _utf8_head_ok(head, final=size <= len(head)):
+                return None  # binary or not UTF-8: skip before reading the rest
+            if with_content and size >= MMAP_MIN_BYTES:
+                content = _decode_mapped(f)
+            elif with_content:
+                data = head + f.read(size - len(head)) if size > len(head) else head
+                content = data.decode("utf-8")
+    except Exception:
+        return None  # unreadable, or not valid UTF-8 past the probe
+    # unknown extensions still get a chance: treat as text if it decodes
+    lang = guess_language(fs_path) if looks_textual(fs_path) else "text"
+    # extensionless scripts only: a .txt/.log that happens to start with "#!" stays text
+    if lang == "text" and fs_path.suffix == "" and head[:2] == b"#!":
+        lang = language_from_shebang(head) or "text"
+    rec = {
+        "abs_path": str(fs_path),
+        "rel_path": rel,
+        "language": lang,
+        "size": size,
+        "mtime_ns": mtime_ns,
+    }
+    if with_content:
+        rec["content"] = content
+    return rec
+
+def read_content(rec: Dict) -> str:
+    """Return a record's text, reading it from `abs_path` when the scan was metadata-only."""
+    content = rec.get("content")
+    if content is not None:
+        return content
+    try:
+        with open(rec["abs_path"], "rb", buffering=0) as f:
+            if rec.get("size", 0) >= MMAP_MIN_BYTES:
+                return _decode_mapped(f, "replace")
+            # raw FileIO.readall() sizes its buffer from fstat and reads in one go
+            return f.read().decode("utf-8", errors="replace")
+    except (OSError, KeyError, ValueError):
+        return ""
+
+def _iter_candidates(
+    base_dir: Path,
+    max_bytes: int,
+    exclude_tokens: List[str],
+    include_hidden: bool,
+    exclude_re: Optional[Pattern[str]],
+) -> Iterator[tuple]:
+    # explicit scandir stack: DirEntry carries the type (and cached stat), and
+    # excluded directories are pruned before their subtree is ever listed
+    stack: List[tuple] = [(str(base_dir), "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
             continue
-        if not looks_textual(fs_path):
-            # try to read a bit anyway — treat as text if decodes
-            content = read_text_safe(fs_path, max_bytes)
-            if content is None:
-                continue
-            lang = "text"
-        else:
-            content = read_text_safe(fs_path, max_bytes)
-            if content is None:
-                continue
-            lang = guess_language(fs_path)
-
-        out.append({
-            "abs_path": str(fs_path),
-            "rel_path": rel.replace("\\", "/"),
-            "language": lang,
-            "size": fs_path.stat().st_size,
-            "content": content,
-        })
+        with it:
+            for entry in it:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if should_exclude(rel, exclude_tokens, include_hidden, exclude_re):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, rel))
+                        continue
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if st.st_size > max_bytes:
+                    continue
+                yield Path(entry.path), rel, st.st_size, st.st_mtime_ns
+
+def harvest_folder(
+    base_dir: Path,
+    max_bytes: int,
+    exclude_tokens: List[str],
+    include_hidden: bool,
+    max_workers: Optional[int] = None,
+    with_content: bool = True,
+    exclude_re: Optional[Pattern[str]] = None,
+) -> List[Dict]:
+    # walk on the calling thread (cheap), fan the sniff/reads out to a pool;
+    # with_content=False returns metadata only (see read_content)
+    if exclude_re is None:
+        exclude_re = compile_excludes(exclude_tokens)
+    candidates = _iter_candidates(base_dir, max_bytes, exclude_tokens, include_hidden, exclude_re)
+
+    def _one(c: tuple) -> Optional[Dict]:
+        return _read_one(c[0], c[1], c[2], c[3], max_bytes, with_content)
+
+    workers = max(1, max_workers or default_workers())
+    head = list(islice(candidates, PARALLEL_MIN_FILES + 1))
+    if workers == 1 or len(head) <= PARALLEL_MIN_FILES:
+        rows = [_one(c) for c in chain(head, candidates)]  # not worth a pool
+    else:
+        # map() submits as the walk yields, so reads start before the walk finishes;
+        # results still come back in walk order
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            rows = list(ex.map(_one, chain(head, candidates)))
+
+    out: List[Dict] = [r for r in rows if r is not None]
     # stable sort by rel_path
     out.sort(key=lambda r: r["rel_path"])
     return out
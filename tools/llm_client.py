@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import re
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import httpx
 
@@ -14,21 +17,128 @@ import httpx
 # Logging helpers
 # ---------------------
 
+@lru_cache(maxsize=8)
+def _log_path(p: str) -> Path:
+    # mkdir once per log path rather than before every logged line
+    path = Path(p)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
 def _log_sink() -> Optional[Path]:
     p = os.getenv("LLM_LOG_FILE", "").strip()
     if not p:
         return None
-    path = Path(p)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    return path
+    return _log_path(p)
 
 def _writeln(line: str) -> None:
     if os.getenv("LLM_DEBUG", "0") == "1":
         print(line, flush=True)
     dest = _log_sink()
-    if dest:
-        with dest.open("a", encoding="utf-8") as f:
+    if not dest:
+        return
+    # best-effort, like groq_openai._emit: a log problem must never fail the LLM call itself
+    try:
+        try:
+            f = dest.open("a", encoding="utf-8")
+        except FileNotFoundError:
+            # the directory was removed after `_log_path` created it
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            f = dest.open("a", encoding="utf-8")
+        with f:
             f.write(line + "\n")
+    except OSError:
+        pass
+
+# Seconds between size checks of the response cache (a check lists every entry)
+CACHE_PRUNE_INTERVAL_S = 60.0
+_prune_lock = threading.Lock()
+_last_prune = [0.0]
+
+def _cache_entries(cache_dir: Path) -> List[tuple]:
+    out = []
+    for shard in (cache_dir.iterdir() if cache_dir.is_dir() else ()):
+        if shard.is_dir():
+            for entry in os.scandir(shard):
+                if entry.name.endswith(".json"):
+                    try:
+                        out.append((entry.path, entry.stat()))
+                    except OSError:
+                        pass
+    return out
+
+def prune_cache(cache_dir: str | Path, max_bytes: int) -> int:
+    """Delete least recently used cache entries until the directory holds at most max_bytes. Returns the count removed."""
+    entries = _cache_entries(Path(cache_dir).expanduser())
+    total = sum(info.st_size for _, info in entries)
+    removed = 0
+    # hits refresh the mtime, so oldest mtime = least recently used
+    for path, info in sorted(entries, key=lambda e: e[1].st_mtime):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= info.st_size
+        removed += 1
+    return removed
+
+def clear_cache(cache_dir: str | Path) -> int:
+    """Delete every cached response under cache_dir. Returns the count removed."""
+    return prune_cache(cache_dir, -1)
+
+def _cache_max_bytes() -> int:
+    return int(float(_clean_env(os.getenv("LLM_CACHE_MAX_MB")) or "256") * 1024 * 1024)
+
+def _cache_store(path: Path, body: bytes) -> None:
+    # write-then-rename, so a concurrent reader never sees a partial response
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+    except OSError as e:
+        _writeln(f"[llm:cache] store failed: {e}")
+        return
+    # bound the directory, at most once per interval per process
+    with _prune_lock:
+        now = time.monotonic()
+        if now - _last_prune[0] < CACHE_PRUNE_INTERVAL_S:
+            return
+        _last_prune[0] = now
+    removed = prune_cache(path.parent.parent, _cache_max_bytes())
+    if removed:
+        _writeln(f"[llm:cache] pruned {removed} entries")
+
+def _cache_drop(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+def _complete(resp: Dict[str, Any]) -> bool:
+    # only whole answers are worth replaying: a cut-off completion would fail the same way every run
+    try:
+        choice = resp["choices"][0]
+        return choice["message"]["content"] is not None and choice.get("finish_reason") != "length"
+    except (KeyError, IndexError, TypeError):
+        return False
+
+def _json_content(resp: Dict[str, Any]) -> Any:
+    try:
+        content = resp["choices"][0]["message"]["content"]
+    except KeyError as e:
+        _writeln(f"[llm:bad] missing message.content in response: {resp}")
+        raise RuntimeError(f"Malformed LLM response: {resp}") from e
+
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        m = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", content, re.DOTALL)
+        if m:
+            return json.loads(m.group(1))
+        cleaned = content.strip().strip("`")
+        return json.loads(cleaned)
 
 def _clean_env(s: Optional[str]) -> Optional[str]:
     if s is None:
@@ -61,13 +171,25 @@ class LLMClient:
       - LLM_BACKOFF_BASE_MS (default 800)
       - LLM_BACKOFF_MAX_MS  (default 8000)
       - LLM_TIMEOUT (seconds, default 120)
-      - LLM_THROTTLE_MS (default 1200)       # sleep before every request
+      - LLM_THROTTLE_MS (default 1200)       # sleep before every request (spacing between concurrent ones)
       - LLM_LOG_FILE (e.g., ./logs/llm_calls.log)
       - LLM_DEBUG=1
       - LLM_BASE_URL (advanced override)
+      - LLM_CACHE_DIR (on-disk response cache keyed on provider/model/payload; off when unset)
+      - LLM_CACHE=0 (bypass the cache even when LLM_CACHE_DIR is set)
+      - LLM_CACHE_MAX_MB (default 256; least recently used entries are pruned past it)
+
+    `http_client` is an optional shared httpx.Client (pooled keep-alive connections across runs);
+    without one the instance opens its own client on first use and reuses it for every call,
+    until close() (or leaving a `with LLMClient() as client:` block).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, http_client: Optional[httpx.Client] = None) -> None:
+        self._http = http_client
+        # a client opened here is closed by close(); a shared one belongs to the caller
+        self._owns_http = http_client is None
+        self._throttle_lock = threading.Lock()
+        self._next_start = 0.0
         provider = _clean_env(os.getenv("LLM_PROVIDER")) or "groq"
         provider = provider.lower()
         self.provider = provider
@@ -109,11 +231,32 @@ class LLMClient:
             f"backoff={self.backoff_base_ms}→{self.backoff_max_ms}ms throttle={self.throttle_ms}ms"
         )
 
+    def close(self) -> None:
+        """Close the connection pool this instance opened (a passed-in http_client is left open)."""
+        with self._throttle_lock:
+            http, self._http = (self._http, None) if self._owns_http else (None, self._http)
+        if http is not None:
+            http.close()
+
+    def __enter__(self) -> "LLMClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
     # ---------------- Chat APIs ----------------
 
     def _maybe_sleep_throttle(self) -> None:
-        if self.throttle_ms > 0:
-            time.sleep(self.throttle_ms / 1000.0)
+        # Reserve a start slot under the lock: sequential calls still wait throttle_ms each,
+        # concurrent callers (threads sharing this client) start throttle_ms apart, not in a burst
+        if self.throttle_ms <= 0:
+            return
+        gap = self.throttle_ms / 1000.0
+        with self._throttle_lock:
+            now = time.monotonic()
+            start = max(now + gap, self._next_start)
+            self._next_start = start + gap
+        time.sleep(start - now)
 
     def _sleep_for_rate_limit(self, r: httpx.Response, preview: str, delay_ms: int) -> int:
         """
@@ -148,11 +291,29 @@ class LLMClient:
         time.sleep(delay_ms / 1000.0)
         return min(delay_ms * 2, self.backoff_max_ms)
 
+    def _cache_file(self, payload: Dict[str, Any]) -> Optional[Path]:
+        cache_dir = _clean_env(os.getenv("LLM_CACHE_DIR"))
+        if not cache_dir or _clean_env(os.getenv("LLM_CACHE")) == "0":
+            return None
+        blob = json.dumps([self.provider, self.base_url, payload], sort_keys=True, ensure_ascii=False)
+        key = hashlib.sha256(blob.encode("utf-8")).hexdigest()
+        # two-char shards keep any one directory small
+        return Path(cache_dir).expanduser() / key[:2] / f"{key}.json"
+
     def chat(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         """
         Return the raw JSON response from the provider's chat/completions API.
         Logs each attempt with status codes and short response previews.
         """
+        return self._request(messages, None, **kwargs)
+
+    def _request(
+        self, messages: List[Dict[str, str]], parse: Optional[Callable[[Dict[str, Any]], Any]], **kwargs
+    ) -> Any:
+        """
+        chat() with an optional `parse` of the response. A response is only cached once it is
+        complete and `parse` accepted it; a cached entry that no longer parses is dropped.
+        """
         url = f"{self.base_url}/chat/completions"
         payload: Dict[str, Any] = {
             "model": self.model,
@@ -191,18 +352,36 @@ class LLMClient:
             f"prompt_chars={prompt_chars} kwargs={json.dumps(kwargs_preview, ensure_ascii=False)}"
         )
 
+        cache_file = self._cache_file(payload)
+        if cache_file is not None:
+            try:
+                cached = json.loads(cache_file.read_bytes())
+                result = parse(cached) if parse else cached
+                os.utime(cache_file)  # recently used: pruned last
+                _writeln(f"[llm:cache] hit {cache_file.name}")
+                return result
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                _writeln(f"[llm:cache] dropping unusable entry {cache_file.name}: {e}")
+                _cache_drop(cache_file)
+
         # Per-call throttle (simple TPM guard)
         self._maybe_sleep_throttle()
 
         delay_ms = self.backoff_base_ms
+        with self._throttle_lock:
+            if self._http is None:
+                self._http = httpx.Client(timeout=self.timeout)
         for attempt in range(1, self.max_retries + 1):
             try:
-                with httpx.Client(timeout=self.timeout) as client:
-                    r = client.post(url, headers=self._headers, json=payload)
+                # reused client: TCP/TLS setup happens once, not once per request
+                r = self._http.post(url, headers=self._headers, json=payload, timeout=self.timeout)
 
                 if r.status_code == 200:
                     _writeln(f"[llm:ok] attempt={attempt} status=200 len={len(r.text)}")
-                    return r.json()
+                    data = r.json()
+                    break
 
                 preview = r.text[:500].replace("\n", "\\n")
                 _writeln(f"[llm:err] attempt={attempt} status={r.status_code} body≈{preview}")
@@ -229,8 +408,14 @@ class LLMClient:
                      raise # Do not retry 4xx client errors except 429
                 time.sleep(delay_ms / 1000.0)
                 delay_ms = min(int(delay_ms * 2), self.backoff_max_ms)
+        else:
+            raise RuntimeError("Exhausted retries")
 
-        raise RuntimeError("Exhausted retries")
+        # parse errors propagate (without a retry, as before) and before anything is cached
+        result = parse(data) if parse else data
+        if cache_file is not None and _complete(data):
+            _cache_store(cache_file, r.content)
+        return result
 
     def chat_json(
         self,
@@ -244,21 +429,7 @@ class LLMClient:
         if response_format is None:
             response_format = {"type": "json_object"}
 
-        resp = self.chat(messages, response_format=response_format, **kwargs)
-        try:
-            content = resp["choices"][0]["message"]["content"]
-        except KeyError as e:
-            _writeln(f"[llm:bad] missing message.content in response: {resp}")
-            raise RuntimeError(f"Malformed LLM response: {resp}") from e
-
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            m = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", content, re.DOTALL)
-            if m:
-                return json.loads(m.group(1))
-            cleaned = content.strip().strip("`")
-            return json.loads(cleaned)
+        return self._request(messages, _json_content, response_format=response_format, **kwargs)
         
         
 # # tools/llm_client.py
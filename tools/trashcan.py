@@ -1,4 +1,5 @@
 from __future__ import annotations
+import os
 import shutil
 import time
 from pathlib import Path
@@ -32,19 +33,32 @@ def move_to_trash(base_dir: Path, rel_paths: List[str]) -> List[Dict]:
     ts = time.strftime("%Y%m%d-%H%M%S")
     trash_root = base_dir / ".trash" / ts
     trash_root.mkdir(parents=True, exist_ok=True)
+    trash_dev = os.stat(trash_root).st_dev
 
     results: List[Dict] = []
+    made_dirs = {trash_root}
     for rel in rel_paths:
         rel = rel.strip().rstrip("/")  # allow folder UI suffix
         if not rel:
             continue
         target = _ensure_within_base(base_dir, Path(rel))
-        if not target.exists():
+        try:
+            src_dev = os.lstat(target).st_dev
+        except FileNotFoundError:
             # skip missing
             continue
         dest = trash_root / rel
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(target), str(dest))
+        if dest.parent not in made_dirs:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(dest.parent)
+        # same filesystem: a single rename(2); otherwise shutil.move copies then deletes
+        if src_dev == trash_dev:
+            try:
+                os.rename(target, dest)
+            except OSError:  # e.g. EXDEV across bind mounts of one device
+                shutil.move(str(target), str(dest))
+        else:
+            shutil.move(str(target), str(dest))
         results.append({"rel_path": rel, "trash_target": str(dest.relative_to(base_dir))})
     return results
 
@@ -7,8 +7,9 @@ import shlex
 import shutil
 import subprocess
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, List, Tuple
 
 __all__ = ["launch_editor", "open_in_vscode", "button_key"]
 
@@ -25,13 +26,18 @@ def button_key(*parts: object) -> str:
       button_key("open", Path("/tmp/foo.txt"))
     """
     # Normalize to text
-    strs = [str(p) for p in parts if p is not None]
+    return _button_key(tuple(str(p) for p in parts if p is not None))
+
+
+@lru_cache(maxsize=8192)
+def _button_key(strs: Tuple[str, ...]) -> str:
+    # the same keys are rebuilt for every listed file on every rerun
     if not strs:
         base = "key"
     else:
         base = strs[0].lower().replace(" ", "_")
-    # Hash all parts for uniqueness (keeps key short + deterministic)
-    h = hashlib.sha1(("||".join(strs)).encode("utf-8")).hexdigest()[:10]
+    # Hash all parts for uniqueness (keeps key short + deterministic); not a security use
+    h = hashlib.blake2b(("||".join(strs)).encode("utf-8"), digest_size=5).hexdigest()
     return f"btn::{base}::{h}"
 
 
@@ -39,6 +45,9 @@ def button_key(*parts: object) -> str:
 # Editor launchers
 # ---------------------------
 
+# PATH lookups are a stat per PATH entry; resolve the launchers once at import.
+_EDITOR_PATHS = {name: shutil.which(name) for name in ("code", "open", "xdg-open", "powershell", "explorer")}
+
 def _run(cmd: Iterable[str]) -> Tuple[bool, str]:
     try:
         res = subprocess.run(list(cmd), check=False, capture_output=True, text=True)
@@ -51,6 +60,14 @@ def _run(cmd: Iterable[str]) -> Tuple[bool, str]:
         return False, str(e)
 
 
+def _run_launcher(name: str, args: List[str]) -> Tuple[bool, str]:
+    # use the path resolved at import; a missing launcher fails without spawning anything
+    exe = _EDITOR_PATHS.get(name)
+    if not exe:
+        return False, f"`{name}` not found on PATH"
+    return _run([exe, *args])
+
+
 def _exists(p: Path) -> bool:
     try:
         return p.exists()
@@ -92,7 +109,7 @@ def open_in_vscode(target: str | os.PathLike) -> Tuple[bool, str]:
             last_err = msg
 
     # 2) Prefer `code` when available
-    code_path = shutil.which("code")
+    code_path = _EDITOR_PATHS["code"]
     if code_path:
         ok, msg = _run([code_path, str(target_path)])
         if ok:
@@ -103,7 +120,7 @@ def open_in_vscode(target: str | os.PathLike) -> Tuple[bool, str]:
 
     # 3) macOS fallback
     if sys.platform == "darwin":
-        ok, msg = _run(["open", "-a", "Visual Studio Code", str(target_path)])
+        ok, msg = _run_launcher("open", ["-a", "Visual Studio Code", str(target_path)])
         if ok:
             return True, 'Opened with macOS `open -a "Visual Studio Code"`.'
         return False, (
@@ -115,20 +132,20 @@ def open_in_vscode(target: str | os.PathLike) -> Tuple[bool, str]:
     # 4) Windows fallback
     if os.name == "nt":
         if code_path:
-            ok, msg = _run([
-                "powershell", "-NoProfile", "-Command",
+            ok, msg = _run_launcher("powershell", [
+                "-NoProfile", "-Command",
                 f"Start-Process -FilePath {shlex.quote(code_path)} -ArgumentList {shlex.quote(str(target_path))}"
             ])
             if ok:
                 return True, "Opened with VS Code (PowerShell)."
             return False, f"Could not launch VS Code. Last error: {msg or last_err}"
-        ok, msg = _run(["explorer", str(target_path)])
+        ok, msg = _run_launcher("explorer", [str(target_path)])
         if ok:
             return True, "VS Code CLI not found; opened folder in Explorer."
         return False, f"Could not launch VS Code. Last error: {msg or last_err}"
 
     # 5) Linux fallback: open folder in default file manager
-    ok, msg = _run(["xdg-open", str(target_path)])
+    ok, msg = _run_launcher("xdg-open", [str(target_path)])
     if ok:
         return True, "VS Code CLI not found; opened folder via xdg-open."
     return False, f"Could not launch VS Code. Last error: {msg or last_err}"
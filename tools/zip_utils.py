@@ -1,17 +1,25 @@
 from __future__ import annotations
 import zipfile
-from typing import Dict, List
+from typing import Dict, List, Optional, Pattern
 from pathlib import Path
 
-from .file_harvester import guess_language, should_exclude, TEXT_EXTS
+from .file_harvester import compile_excludes, guess_language, should_exclude, TEXT_EXTS
 
-def parse_zipfile(zf: zipfile.ZipFile, max_bytes: int, exclude_tokens: List[str], include_hidden: bool) -> List[Dict]:
+def parse_zipfile(
+    zf: zipfile.ZipFile,
+    max_bytes: int,
+    exclude_tokens: List[str],
+    include_hidden: bool,
+    exclude_re: Optional[Pattern[str]] = None,
+) -> List[Dict]:
     out: List[Dict] = []
+    if exclude_re is None:
+        exclude_re = compile_excludes(exclude_tokens)
     for info in zf.infolist():
         if info.is_dir():
             continue
         rel = info.filename
-        if should_exclude(rel, exclude_tokens, include_hidden):
+        if should_exclude(rel, exclude_tokens, include_hidden, exclude_re):
             continue
         # skip very large files
         if info.file_size > max_bytes:
@@ -22,6 +30,8 @@ def parse_zipfile(zf: zipfile.ZipFile, max_bytes: int, exclude_tokens: List[str]
         # Only attempt text-like files; but we also attempt decode with replacement
         with zf.open(info, "r") as f:
             data = f.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            continue  # header understated the size; the sentinel byte caught it
         try:
             text = data.decode("utf-8", errors="replace")
         except Exception: